@@ -1,11 +1,20 @@
 import argparse
+import math
 import os
+import re
+import time
 import logging
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from tools.cloner import GitCloner
+from tools.archive_fetcher import ArchiveFetcher
 from tools.repo_extractor import RepoExtractor
-from tools.reviewer import Reviewer
+from tools.reviewer import Reviewer, review_output_names, GENERATED_FILE_PATTERN
+from tools.cassette import Cassette, CASSETTE_MODES
+from tools.metrics import Metrics
+from tools.speculative_clone import SpeculativeClone, guess_repo_url
+from tools.scheduler import BatchScheduler, load_batch_file
 
 logging.basicConfig(
     level=logging.INFO,
@@ -15,60 +24,358 @@ logging.basicConfig(
 
 def parse_args():
     parser = argparse.ArgumentParser(description="AI Homework Reviewer")
-    parser.add_argument("--link", required=True, help="Repository link to extract")
-    parser.add_argument("--req", required=True, help="Path to homework requirements")
-    return parser.parse_args()
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--link", help="Repository link to extract")
+    source.add_argument(
+        "--batch",
+        help="File with one repository link per line, optionally followed by "
+             "req=PATH priority=N deadline=ISO-DATETIME flag",
+    )
+    parser.add_argument("--req", help="Path to homework requirements")
+    parser.add_argument(
+        "--pair",
+        nargs=2,
+        action="append",
+        metavar=("HOMEWORK_DIR", "REQ"),
+        help="Review HOMEWORK_DIR (relative to the repo root) against REQ; repeat to review several "
+             "weeks from one clone. Overrides --req and the directory from --link",
+    )
+    parser.add_argument(
+        "--fetch",
+        choices=["git", "archive"],
+        default="git",
+        help="How to fetch the repository: full git clone, or branch archive download (falls back to git)",
+    )
+    parser.add_argument(
+        "--chunked",
+        action="store_true",
+        help="Review large homework in token-budgeted groups in parallel, then summarize",
+    )
+    parser.add_argument(
+        "--chunk-tokens",
+        type=int,
+        default=60000,
+        help="Approximate token budget per review group in chunked mode",
+    )
+    parser.add_argument(
+        "--cassette-mode",
+        choices=CASSETTE_MODES,
+        default=None,
+        help="Record LLM calls to, or replay them from, the cassette directory (env: LLM_CASSETTE_MODE)",
+    )
+    parser.add_argument(
+        "--cassette-dir",
+        default=None,
+        help="Directory holding recorded LLM calls (env: LLM_CASSETTE_DIR, default: cassettes)",
+    )
+    parser.add_argument(
+        "--speculative",
+        action="store_true",
+        help="Start cloning the repo guessed from the link while repo info is being extracted (git fetch only)",
+    )
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent reviews in batch mode or with --pair")
+    parser.add_argument(
+        "--host-limit",
+        type=int,
+        default=2,
+        help="Max concurrent git operations per host (github.com, gitee.com) in batch mode",
+    )
+    parser.add_argument(
+        "--deadline-hours",
+        type=float,
+        default=24,
+        help="In batch mode, submissions due within this many hours are reviewed first",
+    )
+    parser.add_argument(
+        "--pack-tokens",
+        type=int,
+        default=0,
+        help="In batch mode, pack small submissions with the same requirements into shared review calls "
+             "of up to this many tokens (0 disables)",
+    )
+    parser.add_argument(
+        "--pack-max-files",
+        type=int,
+        default=20,
+        help="With --pack-tokens, only non-urgent submissions whose homework directory has at most this many "
+             "files are packed",
+    )
+    args = parser.parse_args()
+    if args.batch and args.pair:
+        parser.error("--pair can only be used with --link")
+    if args.req is None and not args.pair:
+        parser.error("--req is required unless --pair is given")
+    return args
 
-def main():
-    load_dotenv()
-    logger = logging.getLogger(__name__)
-    logger.setLevel(logging.INFO)
+def sanitize_author(author: str) -> str:
+    # Sanitize author name for directory use (remove special characters)
+    return author.replace("/", "_").replace("\\", "_").replace(":", "_")
 
-    args = parse_args()
-    current_timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+def find_checkout(dir_suffix):
+    """Return the latest tmp/<timestamp>_<dir_suffix> checkout left by an earlier run, if any."""
+    pattern = re.compile(r"\d{14}_" + re.escape(dir_suffix))
+    if not os.path.isdir("tmp"):
+        return None
+    names = sorted(
+        name for name in os.listdir("tmp")
+        if pattern.fullmatch(name) and os.path.isdir(os.path.join("tmp", name))
+    )
+    return os.path.abspath(os.path.join("tmp", names[-1])) if names else None
 
-    # Initialize components
-    repo_extractor = RepoExtractor(logger)
-    cloner = GitCloner(logger)
-    reviewer = Reviewer(logger)
+def count_files(path):
+    # Same measure as GitCloner.probe_tree_size, taken from a local checkout
+    count = 0
+    for root, dirs, names in os.walk(path):
+        dirs[:] = [d for d in dirs if d != ".git"]
+        count += sum(1 for name in names if not GENERATED_FILE_PATTERN.fullmatch(name))
+    return count
+
+def fetch_repository(args, cloner, archive_fetcher, repo_info, tmp_dir, author_name):
+    if args.fetch == "archive":
+        return archive_fetcher.fetch_repository(
+            repo_info["repo"],
+            tmp_dir,
+            branch=repo_info["branch"],
+            user_homework_dir=repo_info["user_homework_dir"],
+            author=author_name
+        )
+    return cloner.clone_repository(
+        repo_info["repo"],
+        tmp_dir,
+        branch=repo_info["branch"],
+        author=author_name
+    )
+
+def review_repository(args, logger, reviewer, cloned_path, user_homework_dir, requirement_path, output_name):
+    # Setup paths
+    target_homework_dir = os.path.join(cloned_path, user_homework_dir)
+    logger.info("target_homework_dir: " + target_homework_dir)
+    output_path = os.path.join(cloned_path, output_name)
+
+    logger.info(f"Cloned repository to {cloned_path}")
+    logger.info(f"Output path: {output_path}")
 
+    # Perform review
+    logger.info("Starting homework review...")
+    review = reviewer.review_homework_chunked if args.chunked else reviewer.review_homework
+    return review(
+        target_homework_dir=target_homework_dir,
+        homework_requirement_path=requirement_path,
+        output_path=output_path
+    )
+
+def review_pairs(args, logger, reviewer, cloned_path, pairs, current_timestamp):
+    """Review several (homework dir, requirements) pairs concurrently against one checkout."""
+    output_names = review_output_names([requirement_path for _, requirement_path in pairs], current_timestamp)
+    if len(pairs) == 1:
+        homework_dir, requirement_path = pairs[0]
+        return [review_repository(
+            args, logger, reviewer, cloned_path, homework_dir, requirement_path, output_names[0]
+        )]
+
+    with ThreadPoolExecutor(max_workers=min(args.workers, len(pairs))) as executor:
+        futures = [
+            executor.submit(
+                review_repository, args, logger, reviewer, cloned_path, homework_dir, requirement_path, output_name
+            )
+            for (homework_dir, requirement_path), output_name in zip(pairs, output_names)
+        ]
+        return [future.result() for future in futures]
+
+def run_single(args, logger, repo_extractor, cloner, archive_fetcher, reviewer, metrics, current_timestamp):
+    speculation = None
+    replaying = args.cassette_mode == "replay"
     try:
+        # Start cloning the guessed repository while the link is being analyzed
+        guessed_repo = None
+        if args.speculative and args.fetch == "git" and not replaying:
+            guessed_repo = guess_repo_url(args.link)
+        if guessed_repo:
+            speculation = SpeculativeClone(guessed_repo, f"tmp/{current_timestamp}_speculative", logger)
+            speculation.start()
+
         # Extract repository information
         logger.info(f"Extracting repository info from: {args.link}")
         repo_info = repo_extractor.extract_repo_info(args.link)
-        
+        extract_finished_at = time.monotonic()
+
         # Clone repository
-        # Sanitize author name for directory use (remove special characters)
-        author_name = repo_info["author"].replace("/", "_").replace("\\", "_").replace(":", "_")
+        author_name = sanitize_author(repo_info["author"])
         tmp_dir = f"tmp/{current_timestamp}_{author_name}"
-        cloned_path = cloner.clone_repository(
-            repo_info["repo"], 
-            tmp_dir, 
-            branch=repo_info["branch"],
-            author=author_name
-        )
-        
-        # Setup paths
-        target_homework_dir = os.path.join(cloned_path, repo_info["user_homework_dir"])
-        logger.info("target_homework_dir: " + target_homework_dir)
-        output_path = os.path.join(cloned_path, f"homework-review-{current_timestamp}.md")
-        
-        logger.info(f"Cloned repository to {cloned_path}")
-        logger.info(f"Output path: {output_path}")
-        
-        # Perform review
-        logger.info("Starting homework review...")
-        review_result = reviewer.review_homework(
-            target_homework_dir=target_homework_dir,
-            homework_requirement_path=args.req,
-            output_path=output_path
-        )
-        
+        cloned_path = None
+        if replaying:
+            # Replays stay offline by reviewing the checkout the recording run left behind
+            cloned_path = find_checkout(author_name)
+            if cloned_path:
+                logger.info(f"Replay: reusing checkout {cloned_path}")
+        if speculation:
+            cloned_path = speculation.confirm(repo_info["repo"], repo_info["branch"], tmp_dir)
+            metrics.record(
+                "speculative_clone",
+                guessed_repo=guessed_repo,
+                repo=repo_info["repo"],
+                hit=cloned_path is not None,
+                latency_saved_seconds=speculation.latency_saved(extract_finished_at) if cloned_path else 0.0,
+            )
+            stats = metrics.speculation_stats()
+            logger.info(
+                f"Speculative clone {'hit' if cloned_path else 'miss'}; "
+                f"hit rate {stats['hits']}/{stats['attempts']} ({stats['hit_rate']:.0%}), "
+                f"total latency saved {stats['latency_saved_seconds']:.1f}s"
+            )
+
+        if args.pair:
+            pairs = [(homework_dir, requirement_path) for homework_dir, requirement_path in args.pair]
+            # Several homework dirs share the checkout, so an archive download needs the whole tree
+            repo_info = {**repo_info, "user_homework_dir": "."}
+        else:
+            pairs = [(repo_info["user_homework_dir"], args.req)]
+
+        if not cloned_path:
+            cloned_path = fetch_repository(args, cloner, archive_fetcher, repo_info, tmp_dir, author_name)
+
+        review_result = review_pairs(args, logger, reviewer, cloned_path, pairs, current_timestamp)
+
         logger.info(f"Review process completed successfully:\n{review_result}")
-        
+
     except Exception as e:
         logger.error(f"Review process failed: {e}")
         raise
+    finally:
+        if speculation:
+            speculation.cancel()
+
+def run_batch(args, logger, repo_extractor, cloner, archive_fetcher, reviewer, current_timestamp):
+    jobs = load_batch_file(args.batch, args.req)
+    logger.info(f"Loaded {len(jobs)} submissions from {args.batch}")
+    scheduler = BatchScheduler(
+        logger,
+        cloner=cloner,
+        max_workers=args.workers,
+        host_limits={"github.com": args.host_limit, "gitee.com": args.host_limit},
+        deadline_window=timedelta(hours=args.deadline_hours),
+    )
+
+    # Extract repository information for every submission up front so they can be sized
+    def extract(job):
+        try:
+            job.repo_info = repo_extractor.extract_repo_info(job.link)
+        except Exception as e:
+            job.error = f"Failed to extract repo info: {e}"
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        list(executor.map(extract, jobs))
+
+    runnable = [job for job in jobs if job.repo_info]
+    replaying = args.cassette_mode == "replay"
+
+    def checkout_suffix(job):
+        return f"{sanitize_author(job.repo_info['author'])}_{job.index}"
+
+    if replaying:
+        # Size replayed submissions from the checkouts they will reuse instead of probing the host
+        for job in runnable:
+            checkout = find_checkout(checkout_suffix(job))
+            if checkout:
+                job.estimated_cost = count_files(os.path.join(checkout, job.repo_info["user_homework_dir"]))
+    scheduler.estimate_costs([job for job in runnable if job.estimated_cost == math.inf])
+    ordered = scheduler.order(runnable)
+    # Small, non-urgent submissions are reviewed together in the slot of the smallest one
+    if args.pack_tokens and not args.chunked:
+        ordered = scheduler.pack(ordered, max_cost=args.pack_max_files)
+    logger.info("Review order: " + ", ".join(f"{job.link} ({job.estimated_cost})" for job in ordered))
+    output_name = f"homework-review-{current_timestamp}.md"
+
+    def clone_job(job, host_slot):
+        if replaying:
+            checkout = find_checkout(checkout_suffix(job))
+            if checkout:
+                logger.info(f"Replay: reusing checkout {checkout} for {job.link}")
+                return checkout
+        author_name = sanitize_author(job.repo_info["author"])
+        tmp_dir = f"tmp/{current_timestamp}_{checkout_suffix(job)}"
+        with host_slot:
+            return fetch_repository(args, cloner, archive_fetcher, job.repo_info, tmp_dir, author_name)
+
+    def review_packed(packed):
+        def clone_member(member):
+            try:
+                cloned_path = clone_job(member, scheduler.host_limiter.slot(member.host))
+            except Exception as e:
+                logger.error(f"Review of {member.link} failed: {e}")
+                member.error = str(e)
+                return None
+            return {
+                "target_homework_dir": os.path.join(cloned_path, member.repo_info["user_homework_dir"]),
+                "output_path": os.path.join(cloned_path, output_name),
+            }
+
+        # Members are cloned in this job's own worker so the batch never runs more than --workers at once
+        submissions = [clone_member(member) for member in packed.members]
+        cloned = [(member, submission) for member, submission in zip(packed.members, submissions) if submission]
+        if not cloned:
+            return []
+
+        logger.info(f"Reviewing {len(cloned)} small submissions for {packed.requirement_path} in packed batches")
+        results = reviewer.review_homework_batch(
+            [submission for _, submission in cloned], packed.requirement_path
+        )
+        for (member, _), result in zip(cloned, results):
+            if "error" in result:
+                member.error = result["error"]
+            else:
+                member.result = result
+        return results
+
+    def review_job(job, host_slot):
+        if job.members:
+            return review_packed(job)
+        cloned_path = clone_job(job, host_slot)
+        return review_repository(
+            args, logger, reviewer, cloned_path, job.repo_info["user_homework_dir"], job.requirement_path,
+            output_name
+        )
+
+    scheduler.run(ordered, review_job)
+
+    failed = [job for job in jobs if job.error]
+    logger.info(f"Batch completed: {len(jobs) - len(failed)} reviewed, {len(failed)} failed")
+    for job in failed:
+        logger.error(f"{job.link}: {job.error}")
+    if failed:
+        raise RuntimeError(f"{len(failed)} of {len(jobs)} reviews failed")
+
+def main():
+    load_dotenv()
+    logger = logging.getLogger(__name__)
+    logger.setLevel(logging.INFO)
+
+    args = parse_args()
+    current_timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+
+    # Initialize components
+    args.cassette_mode = args.cassette_mode or os.getenv("LLM_CASSETTE_MODE", "off")
+    cassette = None
+    if args.cassette_mode != "off":
+        cassette_dir = args.cassette_dir or os.getenv("LLM_CASSETTE_DIR", "cassettes")
+        cassette = Cassette(cassette_dir, args.cassette_mode, logger)
+        logger.info(f"LLM cassette mode: {args.cassette_mode} ({cassette_dir})")
+    repo_extractor = RepoExtractor(logger, cassette=cassette)
+    cloner = GitCloner(logger)
+    archive_fetcher = ArchiveFetcher(logger, cloner=cloner)
+    reviewer = Reviewer(
+        logger,
+        chunk_token_budget=args.chunk_tokens,
+        max_parallel=args.workers,
+        cassette=cassette,
+        batch_token_budget=args.pack_tokens or 40000,
+    )
+    metrics = Metrics(logger=logger)
+
+    if args.batch:
+        run_batch(args, logger, repo_extractor, cloner, archive_fetcher, reviewer, current_timestamp)
+    else:
+        run_single(args, logger, repo_extractor, cloner, archive_fetcher, reviewer, metrics, current_timestamp)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
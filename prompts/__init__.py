@@ -1,5 +1,14 @@
 from .review import REVIEW_PROMPT
 from .review_en import REVIEW_PROMPT_EN
+from .review_chunked_en import REVIEW_MAP_PROMPT_EN, REVIEW_REDUCE_PROMPT_EN
+from .review_batch_en import REVIEW_BATCH_PROMPT_EN
 from .extract_repo_info import EXTRACT_REPO_INFO_PROMPT
 
-__all__ = ["REVIEW_PROMPT", "EXTRACT_REPO_INFO_PROMPT", "REVIEW_PROMPT_EN"]
\ No newline at end of file
+__all__ = [
+    "REVIEW_PROMPT",
+    "EXTRACT_REPO_INFO_PROMPT",
+    "REVIEW_PROMPT_EN",
+    "REVIEW_MAP_PROMPT_EN",
+    "REVIEW_REDUCE_PROMPT_EN",
+    "REVIEW_BATCH_PROMPT_EN",
+]
@@ -1,2 +1,4 @@
 #!/bin/bash
-cat homework_links.txt | xargs -I {} python main.py --link {} --req ""
\ No newline at end of file
+# Usage: ./review.sh <requirements file>
+# Lines in homework_links.txt may override it with req=PATH
+python main.py --batch homework_links.txt --req "$1"
\ No newline at end of file
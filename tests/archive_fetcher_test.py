@@ -0,0 +1,247 @@
+import io
+import os
+import tarfile
+import tempfile
+import threading
+import unittest
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from tools.archive_fetcher import ArchiveFetcher, HTTPConnectionPool
+
+
+def build_tar_gz(files):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for name, content in files.items():
+            data = content.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def build_zip(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+class ArchiveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    routes = {}
+    requests_seen = []
+
+    def do_GET(self):
+        self.requests_seen.append(self.path)
+        route = self.routes.get(self.path)
+        if route is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        status, headers, body = route
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Clients closing mid-response is expected when a failed download is discarded
+        pass
+
+
+class TestArchiveFetcher(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = QuietHTTPServer(("127.0.0.1", 0), ArchiveHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.target_dir = os.path.join(self.temp_dir, "repo")
+        ArchiveHandler.routes = {}
+        ArchiveHandler.requests_seen = []
+        self.cloner = MagicMock()
+        self.pool = HTTPConnectionPool(timeout=5)
+        self.fetcher = ArchiveFetcher(
+            cloner=self.cloner,
+            pool=self.pool,
+            url_templates={"github.com": self.base_url + "/{owner}/{repo}/{branch_quoted}.tar.gz"},
+        )
+        self.files = {
+            "repo-main/README.md": "root readme",
+            "repo-main/week03/main.py": "print('hello')",
+            "repo-main/week03/pkg/util.py": "x = 1",
+            "repo-main/week04/other.py": "y = 2",
+        }
+
+    def tearDown(self):
+        import shutil
+        self.pool.close()
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_get_archive_url_github(self):
+        fetcher = ArchiveFetcher(cloner=self.cloner)
+        url = fetcher.get_archive_url("https://github.com/user/repo.git", "feature/x")
+        self.assertEqual(url, "https://codeload.github.com/user/repo/tar.gz/refs/heads/feature/x")
+
+    def test_get_archive_url_gitee_quotes_branch(self):
+        fetcher = ArchiveFetcher(cloner=self.cloner)
+        url = fetcher.get_archive_url("https://gitee.com/user/repo.git", "homework/week03")
+        self.assertEqual(url, "https://gitee.com/user/repo/repository/archive/homework%2Fweek03.tar.gz")
+
+    def test_get_archive_url_unknown_host(self):
+        self.assertIsNone(self.fetcher.get_archive_url("https://gitlab.com/user/repo.git", "main"))
+
+    def test_fetch_extracts_only_homework_dir(self):
+        ArchiveHandler.routes["/user/repo/main.tar.gz"] = (200, {}, build_tar_gz(self.files))
+
+        result = self.fetcher.fetch_repository(
+            "https://github.com/user/repo.git", self.target_dir, branch="main", user_homework_dir="week03"
+        )
+
+        self.assertEqual(result, str(Path(self.target_dir).absolute()))
+        self.assertEqual(Path(self.target_dir, "week03", "main.py").read_text(), "print('hello')")
+        self.assertEqual(Path(self.target_dir, "week03", "pkg", "util.py").read_text(), "x = 1")
+        self.assertFalse(Path(self.target_dir, "README.md").exists())
+        self.assertFalse(Path(self.target_dir, "week04").exists())
+        self.cloner.clone_repository.assert_not_called()
+
+    def test_fetch_whole_repo_for_dot_dir(self):
+        ArchiveHandler.routes["/user/repo/main.tar.gz"] = (200, {}, build_tar_gz(self.files))
+
+        self.fetcher.fetch_repository("https://github.com/user/repo.git", self.target_dir, branch="main")
+
+        self.assertTrue(Path(self.target_dir, "README.md").exists())
+        self.assertTrue(Path(self.target_dir, "week04", "other.py").exists())
+
+    def test_fetch_follows_redirect(self):
+        ArchiveHandler.routes["/user/repo/main.tar.gz"] = (302, {"Location": "/archives/main.tar.gz"}, b"")
+        ArchiveHandler.routes["/archives/main.tar.gz"] = (200, {}, build_tar_gz(self.files))
+
+        self.fetcher.fetch_repository(
+            "https://github.com/user/repo.git", self.target_dir, branch="main", user_homework_dir="week03"
+        )
+
+        self.assertTrue(Path(self.target_dir, "week03", "main.py").exists())
+        self.assertEqual(ArchiveHandler.requests_seen, ["/user/repo/main.tar.gz", "/archives/main.tar.gz"])
+
+    def test_fetch_zip_archive(self):
+        fetcher = ArchiveFetcher(
+            cloner=self.cloner,
+            pool=self.pool,
+            url_templates={"gitee.com": self.base_url + "/{owner}/{repo}/{branch_quoted}.zip"},
+        )
+        ArchiveHandler.routes["/user/repo/main.zip"] = (200, {}, build_zip(self.files))
+
+        fetcher.fetch_repository(
+            "https://gitee.com/user/repo.git", self.target_dir, branch="main", user_homework_dir="week04"
+        )
+
+        self.assertEqual(Path(self.target_dir, "week04", "other.py").read_text(), "y = 2")
+        self.assertFalse(Path(self.target_dir, "week03").exists())
+
+    def test_fetch_skips_unsafe_entries(self):
+        files = dict(self.files)
+        files["repo-main/../escape.txt"] = "nope"
+        ArchiveHandler.routes["/user/repo/main.tar.gz"] = (200, {}, build_tar_gz(files))
+
+        self.fetcher.fetch_repository("https://github.com/user/repo.git", self.target_dir, branch="main")
+
+        self.assertFalse(Path(self.temp_dir, "escape.txt").exists())
+
+    def test_fetch_falls_back_on_http_error(self):
+        self.cloner.clone_repository.return_value = "/cloned/path"
+
+        result = self.fetcher.fetch_repository(
+            "https://github.com/user/repo.git", self.target_dir, branch="main", user_homework_dir="week03"
+        )
+
+        self.assertEqual(result, "/cloned/path")
+        self.cloner.clone_repository.assert_called_once_with(
+            "https://github.com/user/repo.git", self.target_dir, branch="main", author=None
+        )
+
+    def test_fetch_falls_back_when_dir_missing(self):
+        ArchiveHandler.routes["/user/repo/main.tar.gz"] = (200, {}, build_tar_gz(self.files))
+        self.cloner.clone_repository.return_value = "/cloned/path"
+
+        result = self.fetcher.fetch_repository(
+            "https://github.com/user/repo.git", self.target_dir, branch="main", user_homework_dir="week09"
+        )
+
+        self.assertEqual(result, "/cloned/path")
+        self.assertFalse(Path(self.target_dir).exists())
+
+    def test_fetch_unknown_host_uses_git_clone(self):
+        self.cloner.clone_repository.return_value = "/cloned/path"
+
+        result = self.fetcher.fetch_repository("https://gitlab.com/user/repo.git", self.target_dir, branch="main")
+
+        self.assertEqual(result, "/cloned/path")
+        self.assertEqual(ArchiveHandler.requests_seen, [])
+
+    def test_pool_reuses_connection(self):
+        ArchiveHandler.routes["/user/repo/main.tar.gz"] = (200, {}, build_tar_gz(self.files))
+
+        self.fetcher.fetch_repository("https://github.com/user/repo.git", self.target_dir, branch="main")
+        first_conn = self.pool._idle[("http", "127.0.0.1", self.server.server_address[1])][0]
+        self.fetcher.fetch_repository("https://github.com/user/repo.git", self.target_dir, branch="main")
+        idle = self.pool._idle[("http", "127.0.0.1", self.server.server_address[1])]
+
+        self.assertEqual(idle, [first_conn])
+
+    def test_failed_extraction_discards_connection(self):
+        ArchiveHandler.routes["/user/repo/main.tar.gz"] = (200, {}, b"not a tarball" * 1000)
+        self.cloner.clone_repository.return_value = "/cloned/path"
+
+        self.fetcher.fetch_repository("https://github.com/user/repo.git", self.target_dir, branch="main")
+
+        self.assertEqual(self.pool._idle.get(("http", "127.0.0.1", self.server.server_address[1]), []), [])
+
+    def test_http_proxy_receives_absolute_uri(self):
+        fetcher = ArchiveFetcher(
+            cloner=self.cloner,
+            pool=self.pool,
+            url_templates={"github.com": "http://archive.example/{owner}/{repo}/{branch_quoted}.tar.gz"},
+        )
+        ArchiveHandler.routes["http://archive.example/user/repo/main.tar.gz"] = (200, {}, build_tar_gz(self.files))
+
+        with patch.dict(os.environ, {"http_proxy": self.base_url, "no_proxy": ""}):
+            fetcher.fetch_repository("https://github.com/user/repo.git", self.target_dir, branch="main")
+
+        self.assertEqual(ArchiveHandler.requests_seen, ["http://archive.example/user/repo/main.tar.gz"])
+        self.assertTrue(Path(self.target_dir, "week03", "main.py").exists())
+
+    def test_fetch_empty_url(self):
+        with self.assertRaises(ValueError) as context:
+            self.fetcher.fetch_repository("", self.target_dir, branch="main")
+        self.assertIn("Repository URL cannot be empty", str(context.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from tools.cassette import Cassette, CassetteMissError
+from tools.repo_extractor import RepoExtractor
+from tools.reviewer import Reviewer
+
+
+class TestCassette(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cassette_dir = os.path.join(self.temp_dir, "cassettes")
+
+    def tearDown(self):
+        import shutil
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError) as context:
+            Cassette(self.cassette_dir, "rewind")
+        self.assertIn("Invalid cassette mode", str(context.exception))
+
+    def test_record_then_replay(self):
+        func = MagicMock(return_value={"stdout": "answer"})
+        Cassette(self.cassette_dir, "record").call("claude:Read", "prompt", func)
+
+        replay_func = MagicMock()
+        result = Cassette(self.cassette_dir, "replay").call("claude:Read", "prompt", replay_func)
+
+        self.assertEqual(result, {"stdout": "answer"})
+        func.assert_called_once()
+        replay_func.assert_not_called()
+
+    def test_replay_miss_raises(self):
+        Cassette(self.cassette_dir, "record").call("claude:Read", "prompt", lambda: "answer")
+
+        with self.assertRaises(CassetteMissError) as context:
+            Cassette(self.cassette_dir, "replay").call("claude:Read", "other prompt", lambda: "live")
+        self.assertIn("No cassette entry", str(context.exception))
+
+    def test_key_depends_on_backend(self):
+        cassette = Cassette(self.cassette_dir, "replay")
+        self.assertNotEqual(cassette.key("claude:Read", "prompt"), cassette.key("claude:Read,Write", "prompt"))
+
+    def test_key_ignores_timestamps(self):
+        cassette = Cassette(self.cassette_dir, "replay")
+        self.assertEqual(
+            cassette.key("claude:Read", "tmp/20250101120000_user/homework-review-20250101120000.md"),
+            cassette.key("claude:Read", "tmp/20250202090000_user/homework-review-20250202090000.md"),
+        )
+
+    def test_key_ignores_checkout_root(self):
+        first = Cassette(self.cassette_dir, "replay", root="/home/a/homework")
+        second = Cassette(self.cassette_dir, "replay", root="/tmp/w/pkg")
+        self.assertEqual(
+            first.key("claude:Read", "Review /home/a/homework/tmp/20250101120000_stua/week03"),
+            second.key("claude:Read", "Review /tmp/w/pkg/tmp/20250202090000_stua/week03"),
+        )
+
+    def test_artifacts_restored_on_replay(self):
+        recorded_path = os.path.join(self.temp_dir, "run1", "review.md")
+
+        def write_report():
+            os.makedirs(os.path.dirname(recorded_path))
+            with open(recorded_path, "w") as f:
+                f.write("# 作业 1")
+            return "done"
+
+        Cassette(self.cassette_dir, "record").call("claude:Write", "prompt", write_report, [recorded_path])
+
+        replay_path = os.path.join(self.temp_dir, "run2", "review.md")
+        Cassette(self.cassette_dir, "replay").call("claude:Write", "prompt", lambda: "live", [replay_path])
+
+        with open(replay_path) as f:
+            self.assertEqual(f.read(), "# 作业 1")
+
+    @patch('subprocess.run')
+    def test_repo_extractor_replays_without_subprocess(self, mock_run):
+        stdout = json.dumps({"result": json.dumps({
+            "repo_url": "https://github.com/user/repo",
+            "branch": "main",
+            "user_homework_dir": "week03",
+            "author": "user",
+        })})
+        mock_run.return_value = MagicMock(returncode=0, stdout=stdout, stderr="")
+        RepoExtractor(cassette=Cassette(self.cassette_dir, "record")).extract_repo_info("https://github.com/user/repo")
+        mock_run.reset_mock()
+
+        repo_info = RepoExtractor(cassette=Cassette(self.cassette_dir, "replay")).extract_repo_info(
+            "https://github.com/user/repo"
+        )
+
+        self.assertEqual(repo_info["repo"], "https://github.com/user/repo.git")
+        mock_run.assert_not_called()
+
+    @patch('subprocess.run')
+    def test_reviewer_replay_writes_report(self, mock_run):
+        output_path = os.path.join(self.temp_dir, "homework-review-20250101120000.md")
+
+        def fake_run(*args, **kwargs):
+            with open(output_path, "w") as f:
+                f.write("report")
+            return MagicMock(returncode=0, stdout="{}", stderr="")
+
+        mock_run.side_effect = fake_run
+        Reviewer(cassette=Cassette(self.cassette_dir, "record")).review_homework("hw", "req.md", output_path)
+        os.unlink(output_path)
+        mock_run.reset_mock()
+
+        replay_output = os.path.join(self.temp_dir, "homework-review-20250202090000.md")
+        result = Reviewer(cassette=Cassette(self.cassette_dir, "replay")).review_homework(
+            "hw", "req.md", replay_output
+        )
+
+        self.assertEqual(result["returncode"], 0)
+        mock_run.assert_not_called()
+        with open(replay_output) as f:
+            self.assertEqual(f.read(), "report")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -230,6 +230,40 @@ class TestGitCloner(unittest.TestCase):
             self.cloner.get_repo_info(self.test_target_dir)
         self.assertIn("Failed to get repository info", str(context.exception))
     
+    @patch('subprocess.run')
+    def test_remote_branch_exists(self, mock_run):
+        mock_result = MagicMock()
+        mock_result.stdout = "abc123\trefs/heads/homework/week03\n"
+        mock_run.return_value = mock_result
+        
+        self.assertTrue(self.cloner.remote_branch_exists(self.test_repo_url, "homework/week03"))
+        self.assertFalse(self.cloner.remote_branch_exists(self.test_repo_url, "week03"))
+        mock_run.assert_called_with(
+            ['git', 'ls-remote', '--heads', self.test_repo_url, 'week03'],
+            capture_output=True, text=True, check=True
+        )
+    
+    @patch('subprocess.run')
+    def test_probe_tree_size(self, mock_run):
+        def mock_subprocess_run(cmd, **kwargs):
+            result = MagicMock()
+            result.stdout = "week03/main.py\nweek03/util.py\n" if 'ls-tree' in cmd else ""
+            return result
+        
+        mock_run.side_effect = mock_subprocess_run
+        
+        self.assertEqual(self.cloner.probe_tree_size(self.test_repo_url, "main", "week03/"), 2)
+        ls_tree_cmd = mock_run.call_args_list[-1][0][0]
+        self.assertEqual(ls_tree_cmd[-2:], ['--', 'week03'])
+    
+    @patch('subprocess.run')
+    def test_probe_tree_size_git_error(self, mock_run):
+        mock_run.side_effect = subprocess.CalledProcessError(128, ['git', 'clone'], "", "fatal: Remote branch main not found")
+        
+        with self.assertRaises(RuntimeError) as context:
+            self.cloner.probe_tree_size(self.test_repo_url, "main")
+        self.assertIn("Failed to probe repository size", str(context.exception))
+    
     @patch('pathlib.Path.exists')
     @patch('subprocess.run')
     def test_permission_error_handling(self, mock_run, mock_exists):
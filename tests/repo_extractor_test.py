@@ -0,0 +1,77 @@
+import json
+import os
+import unittest
+from unittest.mock import patch, MagicMock
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from tools.repo_extractor import RepoExtractor
+
+
+class TestRepoExtractor(unittest.TestCase):
+
+    def setUp(self):
+        self.extractor = RepoExtractor()
+
+    @patch('subprocess.run')
+    def test_call_llm_passes_prompt_on_stdin(self, mock_run):
+        mock_run.return_value = MagicMock(returncode=0, stdout="{}", stderr="")
+        prompt = 'link: "https://gitee.com/$user/repo"'
+
+        self.extractor._call_llm(prompt)
+
+        mock_run.assert_called_once_with(
+            ['claude', '-p', '--output-format', 'json', '--allowed-tools', 'Bash,Read,WebFetch'],
+            input=prompt,
+            capture_output=True,
+            text=True,
+        )
+
+    @patch('subprocess.run')
+    def test_call_llm_failure(self, mock_run):
+        mock_run.return_value = MagicMock(returncode=1, stdout="", stderr="boom")
+
+        with self.assertRaises(RuntimeError) as context:
+            self.extractor._call_llm("prompt")
+        self.assertIn("LLM call failed", str(context.exception))
+
+    @patch('subprocess.run')
+    def test_extract_repo_info(self, mock_run):
+        result = {
+            "repo_url": "https://gitee.com/bai615/ai-engineer-training",
+            "branch": "this/is/a/branch",
+            "user_homework_dir": "week05-my-homework",
+            "author": "bai615",
+        }
+        mock_run.return_value = MagicMock(
+            returncode=0, stdout=json.dumps({"result": json.dumps(result)}), stderr=""
+        )
+
+        repo_info = self.extractor.extract_repo_info(
+            "https://gitee.com/bai615/ai-engineer-training/tree/this/is/a/branch/week05-my-homework"
+        )
+
+        self.assertEqual(repo_info, {
+            "repo": "https://gitee.com/bai615/ai-engineer-training.git",
+            "branch": "this/is/a/branch",
+            "user_homework_dir": "week05-my-homework",
+            "author": "bai615",
+        })
+
+    def test_parse_llm_output_codeblock(self):
+        output = '```json\n{"repo_url": "git@github.com:u/r.git", "branch": "main", "author": "u"}\n```'
+
+        repo_info = self.extractor._parse_llm_output(output)
+
+        self.assertEqual(repo_info["repo"], "git@github.com:u/r.git")
+        self.assertEqual(repo_info["user_homework_dir"], ".")
+
+    def test_parse_llm_output_missing_branch(self):
+        with self.assertRaises(ValueError) as context:
+            self.extractor._parse_llm_output('{"repo_url": "https://github.com/u/r", "author": "u"}')
+        self.assertIn("Missing 'branch'", str(context.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,391 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+import logging
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from tools.reviewer import Reviewer, review_output_names
+
+
+def llm_result(text):
+    return {"stdout": json.dumps({"result": text}), "stderr": "", "returncode": 0}
+
+
+class TestReviewOutputNames(unittest.TestCase):
+
+    def test_single_requirement_keeps_plain_name(self):
+        self.assertEqual(
+            review_output_names(["homework_requirements/week04.md"], "20250101000000"),
+            ["homework-review-20250101000000.md"],
+        )
+
+    def test_names_follow_requirement_files(self):
+        self.assertEqual(
+            review_output_names(
+                ["homework_requirements/week03-pt1.md", "homework_requirements/week04.md"], "20250101000000"
+            ),
+            ["homework-review-20250101000000-week03-pt1.md", "homework-review-20250101000000-week04.md"],
+        )
+
+    def test_duplicate_names_get_unique_suffixes(self):
+        self.assertEqual(
+            review_output_names(["x/a.md", "y/a-1.md", "z/a.md", "a.md"], "ts"),
+            [
+                "homework-review-ts-a.md",
+                "homework-review-ts-a-1.md",
+                "homework-review-ts-a-2.md",
+                "homework-review-ts-a-3.md",
+            ],
+        )
+
+
+class TestReviewer(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.homework_dir = os.path.join(self.temp_dir, "homework")
+        self.output_path = os.path.join(self.temp_dir, "homework-review-20250101000000.md")
+        self.requirement_path = "homework_requirements/week03-pt1.md"
+        self.reviewer = Reviewer(chunk_token_budget=100)
+
+    def tearDown(self):
+        import shutil
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def write_file(self, relative, size):
+        path = os.path.join(self.homework_dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write("x" * size)
+
+    def test_init_with_logger(self):
+        logger = logging.getLogger("test_logger")
+        reviewer = Reviewer(logger)
+        self.assertEqual(reviewer.logger, logger)
+
+    @patch('subprocess.run')
+    def test_call_llm_failure(self, mock_run):
+        mock_run.return_value = MagicMock(returncode=1, stdout="", stderr="boom")
+
+        with self.assertRaises(RuntimeError) as context:
+            self.reviewer._call_llm("prompt")
+        self.assertIn("LLM call failed", str(context.exception))
+
+    @patch('subprocess.run')
+    def test_call_llm_passes_prompt_on_stdin(self, mock_run):
+        mock_run.return_value = MagicMock(returncode=0, stdout="{}", stderr="")
+        prompt = 'Review "week03" with `code` and $HOME intact'
+
+        self.reviewer._call_llm(prompt, allowed_tools="Read")
+
+        mock_run.assert_called_once_with(
+            ['claude', '-p', '--output-format', 'json', '--allowed-tools', 'Read'],
+            input=prompt,
+            capture_output=True,
+            text=True,
+        )
+
+    @patch('subprocess.run')
+    def test_llm_sessions_capped_by_max_parallel(self, mock_run):
+        reviewer = Reviewer(max_parallel=2)
+        active = [0]
+        peak = [0]
+        lock = threading.Lock()
+
+        def fake_run(*args, **kwargs):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return MagicMock(returncode=0, stdout="{}", stderr="")
+
+        mock_run.side_effect = fake_run
+        threads = [threading.Thread(target=reviewer._call_llm, args=(f"prompt {i}",)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(mock_run.call_count, 6)
+        self.assertEqual(peak[0], 2)
+
+    def test_partition_groups_by_module(self):
+        self.write_file("main.py", 40)
+        self.write_file("agents/a.py", 160)
+        self.write_file("agents/b.py", 160)
+        self.write_file("tools/t.py", 80)
+
+        groups = self.reviewer.partition_files(self.homework_dir)
+
+        self.assertEqual(groups, [
+            ["main.py", os.path.join("agents", "a.py"), os.path.join("agents", "b.py")],
+            [os.path.join("tools", "t.py")],
+        ])
+
+    def test_partition_splits_oversized_module(self):
+        self.write_file("agents/a.py", 300)
+        self.write_file("agents/b.py", 300)
+
+        groups = self.reviewer.partition_files(self.homework_dir)
+
+        self.assertEqual(groups, [[os.path.join("agents", "a.py")], [os.path.join("agents", "b.py")]])
+
+    def test_partition_fills_group_before_oversized_module(self):
+        self.write_file("main.py", 12)
+        for module in ("pkg1", "pkg2"):
+            for name in ("a.py", "b.py", "c.py"):
+                self.write_file(f"{module}/{name}", 160)
+
+        groups = self.reviewer.partition_files(self.homework_dir)
+
+        self.assertEqual(groups, [
+            ["main.py", os.path.join("pkg1", "a.py"), os.path.join("pkg1", "b.py")],
+            [os.path.join("pkg1", "c.py"), os.path.join("pkg2", "a.py")],
+            [os.path.join("pkg2", "b.py"), os.path.join("pkg2", "c.py")],
+        ])
+
+    def test_partition_skips_binary_and_ignored(self):
+        self.write_file("main.py", 10)
+        self.write_file(".git/config", 10)
+        self.write_file("__pycache__/main.cpython-311.pyc", 10)
+        self.write_file("image.png", 10)
+        self.write_file("homework-review-20250101000000.md", 10)
+        self.write_file(".review-feedback-20250101000000.md", 10)
+        with open(os.path.join(self.homework_dir, "data.bin.txt"), "wb") as f:
+            f.write(b"abc\0def")
+
+        groups = self.reviewer.partition_files(self.homework_dir)
+
+        self.assertEqual(groups, [["main.py"]])
+
+    def test_chunked_falls_back_to_single_review(self):
+        self.write_file("main.py", 40)
+
+        with patch.object(self.reviewer, "review_homework", return_value={"returncode": 0}) as mock_review:
+            self.reviewer.review_homework_chunked(self.homework_dir, self.requirement_path, self.output_path)
+
+        mock_review.assert_called_once_with(self.homework_dir, self.requirement_path, self.output_path)
+
+    def test_chunked_map_reduce(self):
+        self.write_file("agents/a.py", 300)
+        self.write_file("tools/t.py", 300)
+        prompts = []
+        lock = threading.Lock()
+        report = (
+            "# Assignment 1\n\n## 📋 Overall Summary\n\nsummary\n\n## 🔍 Detailed Feedback\n\n"
+            "<<<FILES>>>\ntools/t.py\n<<<END FILES>>>\n\n## ❓ Questions\n\n## 🎯 Conclusion\n\npass"
+        )
+
+        def fake_call_llm(prompt, allowed_tools="Bash,Read,Write", artifacts=None):
+            with lock:
+                prompts.append(prompt)
+            if "per-file feedback is at" in prompt:
+                return llm_result(report)
+            if "agents" in prompt and "of 2" in prompt and "a.py" in prompt:
+                return llm_result("### `agents/a.py`\n\n- **[Overall]** ok")
+            return llm_result("### `tools/t.py`\n\n- **[Overall]** fine")
+
+        with patch.object(self.reviewer, "_call_llm", side_effect=fake_call_llm):
+            result = self.reviewer.review_homework_chunked(
+                self.homework_dir, self.requirement_path, self.output_path
+            )
+
+        self.assertEqual(result["returncode"], 0)
+        self.assertEqual(len(prompts), 3)
+        reduce_prompts = [p for p in prompts if "per-file feedback is at" in p]
+        self.assertEqual(len(reduce_prompts), 1)
+
+        feedback_path = os.path.join(self.temp_dir, ".review-feedback-20250101000000.md")
+        self.assertIn(feedback_path, reduce_prompts[0])
+        with open(feedback_path) as f:
+            feedback = f.read()
+        self.assertLess(feedback.index("agents/a.py"), feedback.index("tools/t.py"))
+
+        with open(self.output_path) as f:
+            written = f.read()
+        self.assertNotIn("<<<FILES>>>", written)
+        # Sections the reduce call listed come first, unlisted ones are appended
+        self.assertLess(written.index("- **[Overall]** fine"), written.index("- **[Overall]** ok"))
+        self.assertLess(written.index("- **[Overall]** ok"), written.index("## ❓ Questions"))
+
+    def test_chunked_rejects_reduce_without_file_list(self):
+        self.write_file("agents/a.py", 300)
+        self.write_file("tools/t.py", 300)
+
+        def fake_call_llm(prompt, allowed_tools="Bash,Read,Write", artifacts=None):
+            if "per-file feedback is at" in prompt:
+                return llm_result("# Assignment 1\n\n## 📋 Overall Summary\n\n## ❓ Questions\n\n## 🎯 Conclusion")
+            return llm_result("### `tools/t.py`\n\n- **[Overall]** fine")
+
+        with patch.object(self.reviewer, "_call_llm", side_effect=fake_call_llm):
+            with self.assertRaises(RuntimeError) as context:
+                self.reviewer.review_homework_chunked(self.homework_dir, self.requirement_path, self.output_path)
+        self.assertIn("did not list the files", str(context.exception))
+        self.assertFalse(os.path.exists(self.output_path))
+
+    def make_submissions(self, sizes):
+        submissions = []
+        for i, size in enumerate(sizes):
+            homework_dir = os.path.join(self.temp_dir, f"student{i}")
+            os.makedirs(homework_dir)
+            with open(os.path.join(homework_dir, "main.py"), "w") as f:
+                f.write(f"# student {i}\n" + "x" * size)
+            submissions.append({
+                "target_homework_dir": homework_dir,
+                "output_path": os.path.join(homework_dir, "homework-review.md"),
+            })
+        return submissions
+
+    def write_requirements(self, content="# Week 03 {rubric}"):
+        requirement_path = os.path.join(self.temp_dir, "week03.md")
+        with open(requirement_path, "w") as f:
+            f.write(content)
+        return requirement_path
+
+    def batch_reviewer(self, requirement_path, room):
+        """Build a reviewer whose batch budget leaves `room` tokens for submissions."""
+        with open(requirement_path) as f:
+            overhead = Reviewer().batch_overhead_tokens(f.read())
+        return Reviewer(batch_token_budget=overhead + room)
+
+    def valid_review(self, name):
+        return f"# Assignment 1\n\n## 📋 Summary {name}\n\n## 🔍 Feedback\n\n## ❓ Questions\n\n## 🎯 Conclusion"
+
+    def test_batch_review_splits_output(self):
+        submissions = self.make_submissions([100, 100])
+        requirement_path = self.write_requirements()
+        reviewer = self.batch_reviewer(requirement_path, room=400)
+        output = (
+            f"<<<REVIEW S1>>>\n{self.valid_review('one')}\n<<<END REVIEW S1>>>\n"
+            f"<<<REVIEW S2>>>\n{self.valid_review('two')}\n<<<END REVIEW S2>>>"
+        )
+
+        with patch.object(reviewer, "_call_llm", return_value=llm_result(output)) as mock_call, \
+                patch.object(reviewer, "review_homework") as mock_review:
+            results = reviewer.review_homework_batch(submissions, requirement_path)
+
+        mock_call.assert_called_once()
+        prompt = mock_call.call_args[0][0]
+        self.assertEqual(prompt.count("# Week 03 {rubric}"), 1)
+        self.assertIn("=== SUBMISSION S1 ===", prompt)
+        self.assertIn("# student 1", prompt)
+        mock_review.assert_not_called()
+        with open(submissions[0]["output_path"]) as f:
+            self.assertIn("Summary one", f.read())
+        with open(submissions[1]["output_path"]) as f:
+            self.assertIn("Summary two", f.read())
+        self.assertEqual(results[1]["output_path"], submissions[1]["output_path"])
+
+    def test_batch_review_falls_back_on_invalid_section(self):
+        submissions = self.make_submissions([100, 100])
+        requirement_path = self.write_requirements()
+        reviewer = self.batch_reviewer(requirement_path, room=400)
+        output = f"<<<REVIEW S1>>>\n{self.valid_review('one')}\n<<<END REVIEW S1>>>\n<<<REVIEW S2>>>\nok\n<<<END REVIEW S2>>>"
+
+        with patch.object(reviewer, "_call_llm", return_value=llm_result(output)), \
+                patch.object(reviewer, "review_homework", return_value={"returncode": 0}) as mock_review:
+            results = reviewer.review_homework_batch(submissions, requirement_path)
+
+        mock_review.assert_called_once_with(
+            submissions[1]["target_homework_dir"], requirement_path, submissions[1]["output_path"]
+        )
+        self.assertEqual(results[1], {"returncode": 0})
+        self.assertTrue(os.path.exists(submissions[0]["output_path"]))
+
+    def test_batch_review_falls_back_on_llm_failure(self):
+        submissions = self.make_submissions([100, 100])
+        requirement_path = self.write_requirements()
+        reviewer = self.batch_reviewer(requirement_path, room=400)
+
+        with patch.object(reviewer, "_call_llm", side_effect=RuntimeError("LLM call failed")), \
+                patch.object(reviewer, "review_homework", return_value={"returncode": 0}) as mock_review:
+            reviewer.review_homework_batch(submissions, requirement_path)
+
+        self.assertEqual(mock_review.call_count, 2)
+
+    def test_batch_review_keeps_results_when_fallback_fails(self):
+        submissions = self.make_submissions([100, 100])
+        requirement_path = self.write_requirements()
+        reviewer = self.batch_reviewer(requirement_path, room=400)
+
+        def fake_review(target_homework_dir, homework_requirement_path, output_path):
+            if target_homework_dir == submissions[0]["target_homework_dir"]:
+                raise RuntimeError("LLM call failed")
+            return {"returncode": 0}
+
+        with patch.object(reviewer, "_call_llm", side_effect=RuntimeError("LLM call failed")), \
+                patch.object(reviewer, "review_homework", side_effect=fake_review):
+            results = reviewer.review_homework_batch(submissions, requirement_path)
+
+        self.assertEqual(results[0], {"error": "LLM call failed"})
+        self.assertEqual(results[1], {"returncode": 0})
+
+    def test_batch_review_starts_individual_reviews_without_waiting(self):
+        submissions = self.make_submissions([100, 100, 2000])
+        requirement_path = self.write_requirements()
+        reviewer = self.batch_reviewer(requirement_path, room=400)
+        large_started = threading.Event()
+        started_during_batch = []
+
+        def fake_call_llm(prompt, allowed_tools="Bash,Read,Write", artifacts=None):
+            started_during_batch.append(large_started.wait(timeout=2))
+            return llm_result("")
+
+        def fake_review(target_homework_dir, homework_requirement_path, output_path):
+            if target_homework_dir == submissions[2]["target_homework_dir"]:
+                large_started.set()
+            return {"returncode": 0}
+
+        with patch.object(reviewer, "_call_llm", side_effect=fake_call_llm), \
+                patch.object(reviewer, "review_homework", side_effect=fake_review) as mock_review:
+            results = reviewer.review_homework_batch(submissions, requirement_path)
+
+        self.assertEqual(started_during_batch, [True])
+        self.assertEqual(mock_review.call_count, 3)
+        self.assertEqual(results, [{"returncode": 0}] * 3)
+
+    def test_batch_review_packs_by_budget(self):
+        # ~25, ~25, ~75 and ~150 tokens: the last one is too big to pack
+        submissions = self.make_submissions([100, 100, 300, 600])
+        requirement_path = self.write_requirements()
+        reviewer = self.batch_reviewer(requirement_path, room=200)
+        prompts = []
+
+        def fake_call_llm(prompt, allowed_tools="Bash,Read,Write", artifacts=None):
+            prompts.append(prompt)
+            return llm_result("")
+
+        with patch.object(reviewer, "_call_llm", side_effect=fake_call_llm), \
+                patch.object(reviewer, "review_homework", return_value={"returncode": 0}) as mock_review:
+            reviewer.review_homework_batch(submissions, requirement_path)
+
+        self.assertEqual(len(prompts), 1)
+        self.assertIn("# student 2", prompts[0])
+        self.assertNotIn("# student 3", prompts[0])
+        reviewed = sorted(call[0][0] for call in mock_review.call_args_list)
+        self.assertEqual(reviewed, sorted(s["target_homework_dir"] for s in submissions))
+
+    def test_batch_budget_leaves_room_for_requirements(self):
+        submissions = self.make_submissions([100, 100])
+        reviewer = self.batch_reviewer(self.write_requirements(), room=400)
+        # ~500 more tokens of requirements leave no room for the two submissions
+        requirement_path = self.write_requirements("# Week 03\n" + "r" * 2000)
+
+        with patch.object(reviewer, "_call_llm") as mock_call, \
+                patch.object(reviewer, "review_homework", return_value={"returncode": 0}) as mock_review:
+            reviewer.review_homework_batch(submissions, requirement_path)
+
+        mock_call.assert_not_called()
+        self.assertEqual(mock_review.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
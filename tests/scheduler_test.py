@@ -0,0 +1,198 @@
+import math
+import os
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from tools.scheduler import BatchScheduler, ReviewJob, load_batch_file
+
+
+def make_job(index, cost=math.inf, priority=0, deadline=None, flagged=False, repo="https://github.com/u/r.git"):
+    job = ReviewJob(
+        link=f"https://github.com/u/r{index}",
+        requirement_path="req.md",
+        priority=priority,
+        deadline=deadline,
+        flagged=flagged,
+        index=index,
+    )
+    job.repo_info = {"repo": repo, "branch": "main", "user_homework_dir": ".", "author": "u"}
+    job.estimated_cost = cost
+    return job
+
+
+class TestLoadBatchFile(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.batch_path = os.path.join(self.temp_dir, "links.txt")
+
+    def tearDown(self):
+        import shutil
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def write(self, content):
+        with open(self.batch_path, "w") as f:
+            f.write(content)
+
+    def test_load_with_options(self):
+        self.write(
+            "# week03\n"
+            "https://github.com/a/repo\n"
+            "\n"
+            "https://gitee.com/b/repo/tree/main/hw req=week04.md priority=2 deadline=2025-01-01T12:00 flag\n"
+        )
+
+        jobs = load_batch_file(self.batch_path, "default.md")
+
+        self.assertEqual(len(jobs), 2)
+        self.assertEqual(jobs[0].requirement_path, "default.md")
+        self.assertEqual(jobs[0].index, 0)
+        self.assertEqual(jobs[1].requirement_path, "week04.md")
+        self.assertEqual(jobs[1].priority, 2)
+        self.assertEqual(jobs[1].deadline, datetime(2025, 1, 1, 12, 0))
+        self.assertTrue(jobs[1].flagged)
+        self.assertEqual(jobs[1].index, 1)
+
+    def test_load_invalid_option(self):
+        self.write("https://github.com/a/repo priority=high\n")
+
+        with self.assertRaises(ValueError) as context:
+            load_batch_file(self.batch_path, "default.md")
+        self.assertIn("Invalid batch file line 1", str(context.exception))
+
+
+class TestBatchScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.cloner = MagicMock()
+        self.scheduler = BatchScheduler(cloner=self.cloner, max_workers=4, host_limits={"github.com": 1})
+        self.now = datetime(2025, 1, 1, 0, 0)
+
+    def test_order_shortest_first(self):
+        jobs = [make_job(0, cost=50), make_job(1, cost=3), make_job(2), make_job(3, cost=10)]
+
+        ordered = self.scheduler.order(jobs, now=self.now)
+
+        self.assertEqual([job.index for job in ordered], [1, 3, 0, 2])
+
+    def test_order_urgent_and_priority_first(self):
+        jobs = [
+            make_job(0, cost=1),
+            make_job(1, cost=100, deadline=self.now + timedelta(hours=2)),
+            make_job(2, cost=100, flagged=True),
+            make_job(3, cost=100, priority=5),
+            make_job(4, cost=1, deadline=self.now + timedelta(days=7)),
+        ]
+
+        ordered = self.scheduler.order(jobs, now=self.now)
+
+        self.assertEqual([job.index for job in ordered], [1, 2, 3, 0, 4])
+
+    def test_order_urgent_by_deadline_before_priority(self):
+        jobs = [
+            make_job(0, cost=1, priority=5, deadline=self.now + timedelta(hours=20)),
+            make_job(1, cost=100, deadline=self.now + timedelta(hours=1)),
+            make_job(2, cost=1, priority=9, flagged=True),
+        ]
+
+        ordered = self.scheduler.order(jobs, now=self.now)
+
+        self.assertEqual([job.index for job in ordered], [1, 0, 2])
+
+    def test_pack_small_jobs_in_first_slot(self):
+        jobs = [
+            make_job(0, cost=100),
+            make_job(1, cost=3),
+            make_job(2, cost=1, flagged=True),
+            make_job(3, cost=5),
+            make_job(4),
+            make_job(5, cost=4),
+        ]
+        jobs[5].requirement_path = "other.md"
+
+        ordered = self.scheduler.pack(self.scheduler.order(jobs, now=self.now), max_cost=10, now=self.now)
+
+        self.assertEqual([job.index for job in ordered], [2, 1, 5, 0, 4])
+        self.assertEqual([job.index for job in ordered[1].members], [1, 3])
+        self.assertEqual(ordered[1].estimated_cost, 8)
+        self.assertEqual(ordered[2].members, [])
+
+    def test_run_marks_members_of_failed_packed_job(self):
+        members = [make_job(0, cost=1), make_job(1, cost=1)]
+        packed = self.scheduler.pack(members, max_cost=10, now=self.now)[0]
+
+        def func(job, host_slot):
+            members[0].result = "ok 0"
+            raise RuntimeError("requirements missing")
+
+        self.scheduler.run([packed], func)
+
+        self.assertEqual(members[0].result, "ok 0")
+        self.assertIsNone(members[0].error)
+        self.assertEqual(members[1].error, "requirements missing")
+
+    def test_estimate_costs(self):
+        self.cloner.remote_branch_exists.side_effect = lambda url, branch: url != "https://github.com/u/missing.git"
+        self.cloner.probe_tree_size.return_value = 12
+        found = make_job(0)
+        missing = make_job(1, repo="https://github.com/u/missing.git")
+
+        self.scheduler.estimate_costs([found, missing])
+
+        self.assertEqual(found.estimated_cost, 12)
+        self.assertEqual(missing.estimated_cost, math.inf)
+
+    def test_estimate_costs_probe_failure(self):
+        self.cloner.remote_branch_exists.return_value = True
+        self.cloner.probe_tree_size.side_effect = RuntimeError("Failed to probe repository size")
+        job = make_job(0)
+
+        self.scheduler.estimate_costs([job])
+
+        self.assertEqual(job.estimated_cost, math.inf)
+
+    def test_run_records_failures(self):
+        def func(job, host_slot):
+            if job.index == 1:
+                raise RuntimeError("boom")
+            return f"ok {job.index}"
+
+        jobs = self.scheduler.run([make_job(0), make_job(1)], func)
+
+        self.assertEqual(jobs[0].result, "ok 0")
+        self.assertIsNone(jobs[0].error)
+        self.assertEqual(jobs[1].error, "boom")
+
+    def test_run_caps_per_host_concurrency(self):
+        active = {"github.com": 0, "gitee.com": 0}
+        peak = {"github.com": 0, "gitee.com": 0}
+        lock = threading.Lock()
+
+        def func(job, host_slot):
+            with host_slot:
+                with lock:
+                    active[job.host] += 1
+                    peak[job.host] = max(peak[job.host], active[job.host])
+                time.sleep(0.02)
+                with lock:
+                    active[job.host] -= 1
+
+        jobs = [make_job(i) for i in range(3)] + [
+            make_job(i, repo="https://gitee.com/u/r.git") for i in range(3, 6)
+        ]
+        self.scheduler.run(jobs, func)
+
+        self.assertEqual(peak["github.com"], 1)
+        self.assertGreater(peak["gitee.com"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
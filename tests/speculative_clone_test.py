@@ -0,0 +1,156 @@
+import os
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from tools.metrics import Metrics
+from tools.speculative_clone import SpeculativeClone, guess_repo_url, normalize_repo_url
+
+
+def git(*args, cwd=None):
+    subprocess.run(
+        ['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args],
+        cwd=cwd, capture_output=True, text=True, check=True
+    )
+
+
+class TestGuessRepoUrl(unittest.TestCase):
+
+    def test_guess_from_tree_link(self):
+        self.assertEqual(
+            guess_repo_url("https://gitee.com/JShengJun/ai-engineer-training/tree/homework/week03-2/week03-homework-2"),
+            "https://gitee.com/JShengJun/ai-engineer-training.git",
+        )
+
+    def test_guess_from_repo_link(self):
+        self.assertEqual(
+            guess_repo_url("https://github.com/173787247/multi-agent-article-system"),
+            "https://github.com/173787247/multi-agent-article-system.git",
+        )
+
+    def test_guess_unknown_host(self):
+        self.assertIsNone(guess_repo_url("https://example.com/user/repo"))
+
+    def test_guess_too_short(self):
+        self.assertIsNone(guess_repo_url("https://github.com/user"))
+
+    def test_normalize_repo_url(self):
+        self.assertEqual(
+            normalize_repo_url("https://GitHub.com/User/Repo.git"),
+            normalize_repo_url("https://github.com/user/repo/"),
+        )
+
+
+class TestSpeculativeClone(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.temp_dir, "source")
+        os.makedirs(os.path.join(self.source, "week03"))
+        git('init', '-q', '-b', 'main', self.source)
+        Path(self.source, "week03", "main.py").write_text("print('main')")
+        git('add', '.', cwd=self.source)
+        git('commit', '-q', '-m', 'init', cwd=self.source)
+        git('checkout', '-q', '-b', 'homework/week03', cwd=self.source)
+        Path(self.source, "week03", "main.py").write_text("print('homework')")
+        git('commit', '-q', '-am', 'homework', cwd=self.source)
+        git('checkout', '-q', 'main', cwd=self.source)
+        self.repo_url = Path(self.source).as_uri()
+        self.speculative_dir = os.path.join(self.temp_dir, "speculative")
+        self.target_dir = os.path.join(self.temp_dir, "target")
+
+    def tearDown(self):
+        import shutil
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_confirm_hit_checks_out_branch(self):
+        speculation = SpeculativeClone(self.repo_url, self.speculative_dir)
+        speculation.start()
+
+        result = speculation.confirm(self.repo_url + ".git", "homework/week03", self.target_dir)
+
+        self.assertEqual(result, str(Path(self.target_dir).absolute()))
+        self.assertEqual(Path(self.target_dir, "week03", "main.py").read_text(), "print('homework')")
+        self.assertFalse(os.path.exists(self.speculative_dir))
+        self.assertGreaterEqual(speculation.latency_saved(speculation.finished_at + 1), 0.0)
+
+    def test_confirm_miss_cleans_up(self):
+        speculation = SpeculativeClone(self.repo_url, self.speculative_dir)
+        speculation.start()
+
+        result = speculation.confirm("https://github.com/other/repo.git", "main", self.target_dir)
+
+        self.assertIsNone(result)
+        self.assertFalse(os.path.exists(self.speculative_dir))
+        self.assertFalse(os.path.exists(self.target_dir))
+
+    def test_confirm_unknown_branch_cleans_up(self):
+        speculation = SpeculativeClone(self.repo_url, self.speculative_dir)
+        speculation.start()
+
+        result = speculation.confirm(self.repo_url, "no-such-branch", self.target_dir)
+
+        self.assertIsNone(result)
+        self.assertFalse(os.path.exists(self.speculative_dir))
+
+    def test_cancel_after_confirm_keeps_checkout(self):
+        speculation = SpeculativeClone(self.repo_url, self.speculative_dir)
+        speculation.start()
+        speculation.confirm(self.repo_url, "main", self.target_dir)
+
+        speculation.cancel()
+
+        self.assertTrue(Path(self.target_dir, "week03", "main.py").exists())
+
+    def test_confirm_before_start(self):
+        speculation = SpeculativeClone(self.repo_url, self.speculative_dir)
+        with self.assertRaises(RuntimeError):
+            speculation.confirm(self.repo_url, "main", self.target_dir)
+
+    def test_latency_saved_is_bounded_by_extraction(self):
+        speculation = SpeculativeClone(self.repo_url, self.speculative_dir)
+        speculation.started_at = 100.0
+        speculation.finished_at = 130.0
+
+        self.assertEqual(speculation.latency_saved(110.0), 10.0)
+        self.assertEqual(speculation.latency_saved(150.0), 30.0)
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.metrics = Metrics(os.path.join(self.temp_dir, "metrics.jsonl"))
+
+    def tearDown(self):
+        import shutil
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_speculation_stats_empty(self):
+        self.assertEqual(
+            self.metrics.speculation_stats(),
+            {"attempts": 0, "hits": 0, "hit_rate": 0.0, "latency_saved_seconds": 0.0},
+        )
+
+    def test_speculation_stats(self):
+        self.metrics.record("speculative_clone", hit=True, latency_saved_seconds=12.5)
+        self.metrics.record("speculative_clone", hit=False, latency_saved_seconds=0.0)
+        self.metrics.record("speculative_clone", hit=True, latency_saved_seconds=7.5)
+        self.metrics.record("other_event")
+
+        stats = self.metrics.speculation_stats()
+
+        self.assertEqual(stats["attempts"], 3)
+        self.assertEqual(stats["hits"], 2)
+        self.assertAlmostEqual(stats["hit_rate"], 2 / 3)
+        self.assertEqual(stats["latency_saved_seconds"], 20.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 from .cloner import GitCloner
+from .archive_fetcher import ArchiveFetcher
 from .repo_extractor import RepoExtractor
 from .reviewer import Reviewer
 
-__all__ = ["GitCloner", "RepoExtractor", "Reviewer"]
\ No newline at end of file
+__all__ = ["GitCloner", "ArchiveFetcher", "RepoExtractor", "Reviewer"]
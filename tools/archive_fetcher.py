@@ -0,0 +1,332 @@
+import http.client
+import shutil
+import tarfile
+import tempfile
+import threading
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, urljoin, urlsplit
+from urllib.request import getproxies, proxy_bypass
+import logging
+
+from .cloner import GitCloner
+
+
+DEFAULT_ARCHIVE_URL_TEMPLATES = {
+    "github.com": "https://codeload.github.com/{owner}/{repo}/tar.gz/refs/heads/{branch}",
+    "gitee.com": "https://gitee.com/{owner}/{repo}/repository/archive/{branch_quoted}.tar.gz",
+}
+
+
+class HTTPConnectionPool:
+    """Keeps idle keep-alive connections per (scheme, host, port) for reuse."""
+
+    def __init__(self, timeout: float = 30.0, max_idle_per_host: int = 4):
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None):
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {url}")
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname, port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        if scheme == "http" and self._proxy_for(scheme, parts.hostname):
+            # Plain HTTP proxies expect the absolute URI in the request line
+            path = f"http://{parts.netloc}{path}"
+
+        conn = self._acquire(key)
+        try:
+            conn.request(method, path, headers=headers or {})
+            response = conn.getresponse()
+        except (http.client.HTTPException, OSError):
+            # A pooled connection may have been closed by the server; retry once on a fresh one
+            conn.close()
+            conn = self._new_connection(key)
+            conn.request(method, path, headers=headers or {})
+            response = conn.getresponse()
+        return PooledResponse(self, key, conn, response)
+
+    def release(self, key: Tuple[str, str, int], conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            connections = [conn for idle in self._idle.values() for conn in idle]
+            self._idle.clear()
+        for conn in connections:
+            conn.close()
+
+    def _acquire(self, key: Tuple[str, str, int]) -> http.client.HTTPConnection:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop()
+        return self._new_connection(key)
+
+    def _new_connection(self, key: Tuple[str, str, int]) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        proxy = self._proxy_for(scheme, host)
+        if proxy:
+            proxy_parts = urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+            proxy_port = proxy_parts.port or 8080
+            if scheme == "https":
+                conn = http.client.HTTPSConnection(proxy_parts.hostname, proxy_port, timeout=self.timeout)
+                conn.set_tunnel(host, port)
+            else:
+                conn = http.client.HTTPConnection(proxy_parts.hostname, proxy_port, timeout=self.timeout)
+            return conn
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def _proxy_for(self, scheme: str, host: str) -> Optional[str]:
+        return None if proxy_bypass(host) else getproxies().get(scheme)
+
+
+class PooledResponse:
+    """File-like wrapper that hands the connection back to the pool once the body is consumed."""
+
+    def __init__(self, pool: HTTPConnectionPool, key, conn, response: http.client.HTTPResponse):
+        self._pool = pool
+        self._key = key
+        self._conn = conn
+        self._response = response
+        self.status = response.status
+        self.headers = response.headers
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        return self._response.read(amt)
+
+    def readable(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        try:
+            # Drain so the keep-alive connection can be reused
+            while self._response.read(64 * 1024):
+                pass
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            return
+        if self._response.will_close:
+            conn.close()
+        else:
+            self._pool.release(self._key, conn)
+
+    def discard(self) -> None:
+        """Close the connection without reading the rest of the body."""
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # After a failed read the body may be large or broken, so don't drain it for reuse
+        if exc_type is not None:
+            self.discard()
+        else:
+            self.close()
+
+
+class ArchiveFetcher:
+    """Fetches a single homework directory from a branch archive, falling back to git clone."""
+
+    MAX_REDIRECTS = 5
+
+    def __init__(
+        self,
+        logger: Optional[logging.Logger] = None,
+        cloner: Optional[GitCloner] = None,
+        pool: Optional[HTTPConnectionPool] = None,
+        url_templates: Optional[Dict[str, str]] = None,
+    ):
+        self.logger = logger or logging.getLogger(__name__)
+        self.cloner = cloner or GitCloner(self.logger)
+        self.pool = pool or HTTPConnectionPool()
+        self.url_templates = dict(DEFAULT_ARCHIVE_URL_TEMPLATES)
+        if url_templates:
+            self.url_templates.update(url_templates)
+
+    def fetch_repository(
+        self,
+        repo_url: str,
+        target_dir: str,
+        branch: Optional[str] = None,
+        user_homework_dir: str = ".",
+        author: Optional[str] = None,
+    ) -> str:
+        if not repo_url:
+            raise ValueError("Repository URL cannot be empty")
+
+        if not target_dir:
+            raise ValueError("Target directory cannot be empty")
+
+        archive_url = self.get_archive_url(repo_url, branch) if branch else None
+        if not archive_url:
+            self.logger.info(f"No archive download available for {repo_url}, falling back to git clone")
+            return self.cloner.clone_repository(repo_url, target_dir, branch=branch, author=author)
+
+        try:
+            return self.download_archive(archive_url, target_dir, user_homework_dir, author=author)
+        except Exception as e:
+            self.logger.warning(f"Archive download failed ({e}), falling back to git clone")
+            return self.cloner.clone_repository(repo_url, target_dir, branch=branch, author=author)
+
+    def get_archive_url(self, repo_url: str, branch: str) -> Optional[str]:
+        parts = urlsplit(repo_url)
+        host = (parts.hostname or "").lower()
+        template = self.url_templates.get(host)
+        if not template:
+            return None
+
+        segments = [s for s in parts.path.split("/") if s]
+        if len(segments) < 2:
+            return None
+        owner, repo = segments[0], segments[1]
+        if repo.endswith(".git"):
+            repo = repo[:-4]
+
+        return template.format(
+            owner=owner,
+            repo=repo,
+            branch=quote(branch, safe="/"),
+            branch_quoted=quote(branch, safe=""),
+        )
+
+    def download_archive(
+        self,
+        archive_url: str,
+        target_dir: str,
+        user_homework_dir: str = ".",
+        author: Optional[str] = None,
+    ) -> str:
+        target_path = Path(target_dir)
+        if target_path.exists():
+            if target_path.is_dir():
+                self.logger.warning(f"Target directory {target_dir} already exists. Removing it.")
+                shutil.rmtree(target_path)
+            else:
+                raise ValueError(f"Target path {target_dir} exists but is not a directory")
+        target_path.mkdir(parents=True)
+
+        log_message = f"Downloading archive {archive_url} to {target_dir}"
+        if author:
+            log_message += f" (author: {author})"
+        self.logger.info(log_message)
+
+        subdir = self._normalize_subdir(user_homework_dir)
+        try:
+            with self._open(archive_url) as response:
+                content_type = response.headers.get("Content-Type", "")
+                if archive_url.endswith(".zip") or ("zip" in content_type and "gzip" not in content_type):
+                    count = self._extract_zip(response, target_path, subdir)
+                else:
+                    count = self._extract_tar(response, target_path, subdir)
+            self._verify(target_path, subdir, count)
+        except Exception:
+            shutil.rmtree(target_path, ignore_errors=True)
+            raise
+
+        self.logger.info(f"Extracted {count} files from archive to {target_dir}")
+        return str(target_path.absolute())
+
+    def _open(self, url: str) -> PooledResponse:
+        for _ in range(self.MAX_REDIRECTS + 1):
+            response = self.pool.request("GET", url, headers={"User-Agent": "ai-engineer-homework"})
+            if response.status in (301, 302, 303, 307, 308):
+                location = response.headers.get("Location")
+                response.close()
+                if not location:
+                    raise RuntimeError(f"Redirect without Location header from {url}")
+                url = urljoin(url, location)
+                continue
+            if response.status != 200:
+                response.close()
+                raise RuntimeError(f"Archive download failed with HTTP {response.status}: {url}")
+            return response
+        raise RuntimeError(f"Too many redirects while downloading {url}")
+
+    def _extract_tar(self, stream, target_path: Path, subdir: PurePosixPath) -> int:
+        count = 0
+        # "r|*" reads the archive as a forward-only stream, one member at a time
+        with tarfile.open(fileobj=stream, mode="r|*") as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                relative = self._member_path(member.name, subdir)
+                if relative is None:
+                    continue
+                source = archive.extractfile(member)
+                if source is None:
+                    continue
+                with source:
+                    self._write_member(source, target_path, relative)
+                count += 1
+        return count
+
+    def _extract_zip(self, stream, target_path: Path, subdir: PurePosixPath) -> int:
+        # Zip needs random access to its central directory, so spool to disk rather than memory
+        count = 0
+        with tempfile.TemporaryFile() as spool:
+            shutil.copyfileobj(stream, spool, 64 * 1024)
+            spool.seek(0)
+            with zipfile.ZipFile(spool) as archive:
+                for info in archive.infolist():
+                    if info.is_dir():
+                        continue
+                    relative = self._member_path(info.filename, subdir)
+                    if relative is None:
+                        continue
+                    with archive.open(info) as source:
+                        self._write_member(source, target_path, relative)
+                    count += 1
+        return count
+
+    def _member_path(self, name: str, subdir: PurePosixPath) -> Optional[PurePosixPath]:
+        # Archives wrap everything in a single top-level "<repo>-<branch>/" directory
+        parts = PurePosixPath(name).parts
+        if len(parts) < 2:
+            return None
+        relative = PurePosixPath(*parts[1:])
+        if relative.is_absolute() or ".." in relative.parts:
+            self.logger.warning(f"Skipping unsafe archive entry: {name}")
+            return None
+        if subdir.parts and relative.parts[: len(subdir.parts)] != subdir.parts:
+            return None
+        return relative
+
+    def _write_member(self, source, target_path: Path, relative: PurePosixPath) -> None:
+        destination = target_path.joinpath(*relative.parts)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        with open(destination, "wb") as out:
+            shutil.copyfileobj(source, out, 64 * 1024)
+
+    def _normalize_subdir(self, user_homework_dir: str) -> PurePosixPath:
+        subdir = PurePosixPath((user_homework_dir or ".").strip("/"))
+        if ".." in subdir.parts:
+            raise ValueError(f"Invalid homework directory: {user_homework_dir}")
+        return PurePosixPath(*[p for p in subdir.parts if p != "."])
+
+    def _verify(self, target_path: Path, subdir: PurePosixPath, count: int) -> None:
+        homework_path = target_path.joinpath(*subdir.parts)
+        if count == 0 or not homework_path.is_dir():
+            raise RuntimeError(f"Archive contains no files under '{subdir}'")
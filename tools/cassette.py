@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+import logging
+
+
+CASSETTE_MODES = ("off", "record", "replay")
+
+# Run-specific values that would otherwise change the prompt hash on every run
+DEFAULT_NORMALIZERS: List[Tuple[str, str]] = [
+    (r"\d{14}", "<TIMESTAMP>"),
+]
+
+
+class CassetteMissError(RuntimeError):
+    pass
+
+
+class Cassette:
+    """Records LLM request/response pairs to a directory and replays them without calling the LLM."""
+
+    def __init__(
+        self,
+        directory: str,
+        mode: str = "record",
+        logger: Optional[logging.Logger] = None,
+        normalizers: Optional[List[Tuple[str, str]]] = None,
+        root: Optional[str] = None,
+    ):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Invalid cassette mode '{mode}', expected one of {', '.join(CASSETTE_MODES)}")
+        if not directory:
+            raise ValueError("Cassette directory cannot be empty")
+
+        self.directory = Path(directory)
+        self.mode = mode
+        self.logger = logger or logging.getLogger(__name__)
+        self.normalizers = [
+            (re.compile(pattern), replacement)
+            for pattern, replacement in (DEFAULT_NORMALIZERS if normalizers is None else normalizers)
+        ]
+        # Clone paths are absolute, so the checkout location is hashed as <ROOT> to match across checkouts
+        self.root = os.path.abspath(root or os.getcwd())
+
+    def key(self, backend: str, prompt: str) -> str:
+        normalized = prompt if self.root == os.sep else prompt.replace(self.root, "<ROOT>")
+        for pattern, replacement in self.normalizers:
+            normalized = pattern.sub(replacement, normalized)
+        return hashlib.sha256(f"{backend}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def call(
+        self,
+        backend: str,
+        prompt: str,
+        func: Callable[[], Any],
+        artifacts: Optional[List[str]] = None,
+    ) -> Any:
+        """
+        Serve the response for (backend, prompt) from the cassette, or call func and record it.
+
+        artifacts are files the LLM writes as a side effect (e.g. the review report); their
+        contents are recorded alongside the response and restored to the given paths on replay.
+        """
+        if self.mode == "off":
+            return func()
+
+        key = self.key(backend, prompt)
+        path = self.directory / f"{key}.json"
+
+        if self.mode == "replay":
+            if not path.exists():
+                raise CassetteMissError(
+                    f"No cassette entry {key} for backend '{backend}' in {self.directory}; "
+                    f"prompt starts with: {prompt.strip()[:200]!r}"
+                )
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            self._restore_artifacts(entry.get("artifacts", []), artifacts or [])
+            self.logger.info(f"Replayed LLM response from cassette {path}")
+            return entry["response"]
+
+        response = func()
+        entry = {
+            "backend": backend,
+            "prompt": prompt,
+            "response": response,
+            "artifacts": self._read_artifacts(artifacts or []),
+        }
+        self._write_entry(path, entry)
+        self.logger.info(f"Recorded LLM response to cassette {path}")
+        return response
+
+    def _read_artifacts(self, artifacts: List[str]) -> List[Optional[str]]:
+        contents = []
+        for artifact in artifacts:
+            try:
+                with open(artifact, encoding="utf-8") as f:
+                    contents.append(f.read())
+            except FileNotFoundError:
+                contents.append(None)
+        return contents
+
+    def _restore_artifacts(self, recorded: List[Optional[str]], artifacts: List[str]) -> None:
+        for artifact, content in zip(artifacts, recorded):
+            if content is None:
+                continue
+            Path(artifact).parent.mkdir(parents=True, exist_ok=True)
+            with open(artifact, "w", encoding="utf-8") as f:
+                f.write(content)
+
+    def _write_entry(self, path: Path, entry: dict) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
@@ -1,6 +1,7 @@
 import os
 import shutil
 import subprocess
+import tempfile
 from pathlib import Path
 from typing import Optional
 import logging
@@ -51,6 +52,47 @@ class GitCloner:
         self.logger.info(f"Successfully cloned repository to {target_dir}")
         return str(target_path.absolute())
     
+    def remote_branch_exists(self, repo_url: str, branch: str) -> bool:
+        if not repo_url:
+            raise ValueError("Repository URL cannot be empty")
+        
+        try:
+            result = subprocess.run(
+                ['git', 'ls-remote', '--heads', repo_url, branch],
+                capture_output=True, text=True, check=True
+            )
+        except subprocess.CalledProcessError as e:
+            stderr = e.stderr if e.stderr else "Unknown error"
+            error_msg = f"Git ls-remote failed: {stderr.strip()}"
+            self.logger.error(error_msg)
+            raise RuntimeError(error_msg) from e
+        
+        return any(line.endswith(f"refs/heads/{branch}") for line in result.stdout.splitlines())
+    
+    def probe_tree_size(self, repo_url: str, branch: str, path: str = ".") -> int:
+        """Count the files under path on branch using a blobless, depth-1 bare clone."""
+        if not repo_url:
+            raise ValueError("Repository URL cannot be empty")
+        
+        with tempfile.TemporaryDirectory(prefix="probe_") as probe_dir:
+            try:
+                subprocess.run(
+                    ['git', 'clone', '--bare', '--depth', '1', '--filter=blob:none',
+                     '--branch', branch, repo_url, probe_dir],
+                    capture_output=True, text=True, check=True
+                )
+                cmd = ['git', '-C', probe_dir, 'ls-tree', '-r', '--name-only', 'HEAD']
+                if path and path.strip("/") not in ("", "."):
+                    cmd.extend(['--', path.strip("/")])
+                result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            except subprocess.CalledProcessError as e:
+                stderr = e.stderr if e.stderr else "Unknown error"
+                error_msg = f"Failed to probe repository size: {stderr.strip()}"
+                self.logger.error(error_msg)
+                raise RuntimeError(error_msg) from e
+        
+        return len([line for line in result.stdout.splitlines() if line])
+    
     def delete_repository(self, repo_path: str) -> bool:
         if not repo_path:
             raise ValueError("Repository path cannot be empty")
@@ -0,0 +1,53 @@
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import logging
+
+
+class Metrics:
+    """Appends pipeline events to a JSON-lines file and summarizes them across runs."""
+
+    def __init__(self, path: str = "tmp/metrics.jsonl", logger: Optional[logging.Logger] = None):
+        if not path:
+            raise ValueError("Metrics path cannot be empty")
+        self.path = Path(path)
+        self.logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+    def record(self, event: str, **fields: Any) -> Dict[str, Any]:
+        entry = {"event": event, "time": time.time(), **fields}
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return entry
+
+    def load(self, event: Optional[str] = None) -> List[Dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        entries = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    self.logger.warning(f"Skipping malformed metrics line in {self.path}")
+                    continue
+                if event is None or entry.get("event") == event:
+                    entries.append(entry)
+        return entries
+
+    def speculation_stats(self) -> Dict[str, Any]:
+        entries = self.load("speculative_clone")
+        hits = [e for e in entries if e.get("hit")]
+        return {
+            "attempts": len(entries),
+            "hits": len(hits),
+            "hit_rate": len(hits) / len(entries) if entries else 0.0,
+            "latency_saved_seconds": sum(e.get("latency_saved_seconds", 0.0) for e in hits),
+        }
@@ -4,11 +4,15 @@ import subprocess
 import logging
 from typing import Dict, Optional, Any
 from prompts import EXTRACT_REPO_INFO_PROMPT
+from .cassette import Cassette
 
 
 class RepoExtractor:
-    def __init__(self, logger: Optional[logging.Logger] = None):
+    LLM_BACKEND = "claude:Bash,Read,WebFetch"
+
+    def __init__(self, logger: Optional[logging.Logger] = None, cassette: Optional[Cassette] = None):
         self.logger = logger or logging.getLogger("RepoExtractor")
+        self.cassette = cassette
 
     def extract_repo_info(self, link: str) -> Dict[str, str]:
         extract_repo_info_prompt = EXTRACT_REPO_INFO_PROMPT.format(link=link)
@@ -32,9 +36,15 @@ class RepoExtractor:
             raise
 
     def _call_llm(self, prompt: str) -> str:
+        if self.cassette:
+            return self.cassette.call(self.LLM_BACKEND, prompt, lambda: self._run_llm(prompt))
+        return self._run_llm(prompt)
+
+    def _run_llm(self, prompt: str) -> str:
+        # The prompt goes over stdin so quotes, $ and length never hit the shell or ARG_MAX
         result = subprocess.run(
-            f"claude -p \"{prompt}\" --output-format json --allowed-tools Bash,Read,WebFetch",
-            shell=True,
+            ['claude', '-p', '--output-format', 'json', '--allowed-tools', 'Bash,Read,WebFetch'],
+            input=prompt,
             capture_output=True,
             text=True,
         )
@@ -1,13 +1,66 @@
+import json
+import os
+import re
 import subprocess
 import logging
-from typing import Dict, Optional, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Any
 from datetime import datetime
-from prompts import REVIEW_PROMPT_EN
+from prompts import REVIEW_PROMPT_EN, REVIEW_MAP_PROMPT_EN, REVIEW_REDUCE_PROMPT_EN, REVIEW_BATCH_PROMPT_EN
+from .cassette import Cassette
+
+
+IGNORED_DIRS = {".git", "__pycache__", "node_modules", ".venv", "venv", ".idea", ".vscode", ".pytest_cache"}
+BINARY_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".pdf", ".zip", ".gz", ".tar",
+    ".pyc", ".so", ".dll", ".exe", ".bin", ".pt", ".pth", ".onnx", ".npy", ".pkl",
+    ".db", ".sqlite", ".mp3", ".mp4", ".wav",
+}
+# Reports and feedback files written by earlier reviews of the same checkout
+GENERATED_FILE_PATTERN = re.compile(r"(homework-review-.*|\.review-feedback-.*)\.md")
+CHARS_PER_TOKEN = 4
+# Section headings every review must contain, from the REVIEW_PROMPT_EN template
+REQUIRED_REVIEW_SECTIONS = ("## 📋", "## 🔍", "## ❓", "## 🎯")
+
+
+def review_output_names(requirement_paths: List[str], timestamp: str) -> List[str]:
+    """Name one report per requirements file, suffixing -1, -2, ... until every name is unique."""
+    if len(requirement_paths) == 1:
+        return [f"homework-review-{timestamp}.md"]
+
+    names: List[str] = []
+    used = set()
+    counters: Dict[str, int] = {}
+    for requirement_path in requirement_paths:
+        base = f"homework-review-{timestamp}-{os.path.splitext(os.path.basename(requirement_path))[0]}"
+        name = base
+        count = counters.get(base, 0)
+        while name in used:
+            count += 1
+            name = f"{base}-{count}"
+        counters[base] = count
+        used.add(name)
+        names.append(f"{name}.md")
+    return names
 
 
 class Reviewer:
-    def __init__(self, logger: Optional[logging.Logger] = None):
+    def __init__(
+        self,
+        logger: Optional[logging.Logger] = None,
+        chunk_token_budget: int = 60000,
+        max_parallel: int = 4,
+        cassette: Optional[Cassette] = None,
+        batch_token_budget: int = 40000,
+    ):
         self.logger = logger or logging.getLogger("Reviewer")
+        self.chunk_token_budget = chunk_token_budget
+        self.max_parallel = max_parallel
+        # Caps claude sessions across every caller, including reviews nested inside batch workers
+        self._llm_slots = threading.BoundedSemaphore(max_parallel)
+        self.cassette = cassette
+        self.batch_token_budget = batch_token_budget
 
     def review_homework(
         self, 
@@ -23,7 +76,7 @@ class Reviewer:
             )
             self.logger.info("review_prompt:\n " + review_prompt)
             
-            result = self._call_llm(review_prompt)
+            result = self._call_llm(review_prompt, artifacts=[output_path])
             
             self.logger.info("Review completed successfully")
             self.logger.info(f"Command executed with exit code: {result.get('returncode', 'unknown')}")
@@ -34,6 +87,304 @@ class Reviewer:
             self.logger.error(f"Failed to review homework: {e}")
             raise
 
+    def review_homework_chunked(
+        self,
+        target_homework_dir: str,
+        homework_requirement_path: str,
+        output_path: str
+    ) -> Dict[str, Any]:
+        try:
+            groups = self.partition_files(target_homework_dir)
+            if len(groups) <= 1:
+                self.logger.info("Homework fits in a single review group, using regular review")
+                return self.review_homework(target_homework_dir, homework_requirement_path, output_path)
+
+            self.logger.info(f"Starting chunked homework review with {len(groups)} groups...")
+            with ThreadPoolExecutor(max_workers=self.max_parallel) as executor:
+                feedback = list(executor.map(
+                    lambda indexed: self._review_group(
+                        target_homework_dir, homework_requirement_path, indexed[0], len(groups), indexed[1]
+                    ),
+                    enumerate(groups, start=1),
+                ))
+
+            feedback_path = self._feedback_path(output_path)
+            with open(feedback_path, "w", encoding="utf-8") as f:
+                f.write("\n\n".join(feedback))
+            self.logger.info(f"Per-file feedback written to {feedback_path}")
+
+            reduce_prompt = REVIEW_REDUCE_PROMPT_EN.format(
+                target_homework_dir=target_homework_dir,
+                homework_requirement_path=homework_requirement_path,
+                feedback_path=feedback_path
+            )
+            result = self._call_llm(reduce_prompt, allowed_tools="Read")
+            report = self._assemble_report(json.loads(result["stdout"])["result"], feedback)
+            with open(output_path, "w", encoding="utf-8") as f:
+                f.write(report + "\n")
+            self.logger.info(f"Chunked review written to {output_path}")
+
+            self.logger.info("Chunked review completed successfully")
+            return {**result, "output_path": output_path}
+
+        except Exception as e:
+            self.logger.error(f"Failed to review homework in chunks: {e}")
+            raise
+
+    def partition_files(self, target_homework_dir: str) -> List[List[str]]:
+        """Group reviewable files by top-level module so each group fits in the token budget."""
+        modules: Dict[str, List[tuple]] = {}
+        for relative, tokens in self._list_files(target_homework_dir):
+            module = relative.split(os.sep, 1)[0] if os.sep in relative else "."
+            modules.setdefault(module, []).append((relative, tokens))
+
+        groups: List[List[str]] = []
+        current: List[str] = []
+        current_tokens = 0
+        for module in sorted(modules):
+            files = modules[module]
+            module_tokens = sum(tokens for _, tokens in files)
+            # Keep a module together when it fits, otherwise spill it file by file into the current group
+            fits = module_tokens <= self.chunk_token_budget
+            if fits and current and current_tokens + module_tokens > self.chunk_token_budget:
+                groups.append(current)
+                current, current_tokens = [], 0
+            for relative, tokens in files:
+                if current and current_tokens + tokens > self.chunk_token_budget:
+                    groups.append(current)
+                    current, current_tokens = [], 0
+                current.append(relative)
+                current_tokens += tokens
+        if current:
+            groups.append(current)
+        return groups
+
+    def review_homework_batch(
+        self,
+        submissions: List[Dict[str, str]],
+        homework_requirement_path: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Review several small submissions for the same requirements, packing them into shared LLM calls.
+
+        Each submission is a dict with target_homework_dir and output_path. Submissions that do not fit
+        the batch budget, or whose review in a batch fails validation, are reviewed individually.
+        Results are returned in submission order; a submission whose review failed gets {"error": ...}.
+        """
+        with open(homework_requirement_path, encoding="utf-8") as f:
+            requirements = f.read()
+
+        # The template and requirements go into every batch call; only the rest is left for submissions
+        budget = self.batch_token_budget - self.batch_overhead_tokens(requirements)
+        if budget <= 0:
+            self.logger.warning(
+                f"Requirements in {homework_requirement_path} leave no room in the batch budget, "
+                f"reviewing submissions individually"
+            )
+
+        batches: List[List[int]] = []
+        individual: List[int] = []
+        current: List[int] = []
+        current_tokens = 0
+        for index, submission in enumerate(submissions):
+            tokens = self.estimate_submission_tokens(submission["target_homework_dir"])
+            # Only submissions that leave room for at least one more are worth packing
+            if tokens > budget // 2:
+                individual.append(index)
+                continue
+            if current and current_tokens + tokens > budget:
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(submissions)
+        individual.extend(index for batch in batches if len(batch) == 1 for index in batch)
+        packed_batches = [batch for batch in batches if len(batch) > 1]
+
+        def review_individually(index: int) -> None:
+            submission = submissions[index]
+            try:
+                results[index] = self.review_homework(
+                    submission["target_homework_dir"], homework_requirement_path, submission["output_path"]
+                )
+            except Exception as e:
+                # Keep the other submissions' results; the caller decides how to report this one
+                self.logger.error(f"Review of {submission['target_homework_dir']} failed: {e}")
+                results[index] = {"error": str(e)}
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel) as executor:
+            # Submissions known to need their own review do not wait for the batch calls
+            batch_futures = [
+                executor.submit(self._review_batch, submissions, batch, requirements, results)
+                for batch in packed_batches
+            ]
+            futures = [executor.submit(review_individually, index) for index in sorted(individual)]
+            for batch_future in as_completed(batch_futures):
+                futures.extend(executor.submit(review_individually, index) for index in batch_future.result())
+            for future in futures:
+                future.result()
+        return results
+
+    def estimate_submission_tokens(self, target_homework_dir: str) -> int:
+        return sum(tokens for _, tokens in self._list_files(target_homework_dir))
+
+    def batch_overhead_tokens(self, requirements: str) -> int:
+        return len(REVIEW_BATCH_PROMPT_EN + requirements) // CHARS_PER_TOKEN
+
+    def _review_batch(
+        self,
+        submissions: List[Dict[str, str]],
+        batch: List[int],
+        requirements: str,
+        results: List[Optional[Dict[str, Any]]]
+    ) -> List[int]:
+        """Review one packed batch, write the valid reviews and return the indexes that need a fallback."""
+        ids = {f"S{position}": index for position, index in enumerate(batch, start=1)}
+        packed = "\n\n".join(
+            self._pack_submission(submission_id, submissions[index]["target_homework_dir"])
+            for submission_id, index in ids.items()
+        )
+        batch_prompt = REVIEW_BATCH_PROMPT_EN.format(
+            submission_count=len(batch),
+            requirements=requirements.strip(),
+            submissions=packed
+        )
+        self.logger.info(f"Reviewing {len(batch)} submissions in one batch")
+
+        try:
+            result = self._call_llm(batch_prompt, allowed_tools="Read")
+            reviews = self._split_batch_output(json.loads(result["stdout"])["result"])
+        except Exception as e:
+            self.logger.warning(f"Batch review failed ({e}), falling back to individual reviews")
+            return list(batch)
+
+        failed = []
+        for submission_id, index in ids.items():
+            review = reviews.get(submission_id)
+            if not review or not self._is_valid_review(review):
+                self.logger.warning(
+                    f"Batch review for {submissions[index]['target_homework_dir']} failed validation, "
+                    f"falling back to individual review"
+                )
+                failed.append(index)
+                continue
+            output_path = submissions[index]["output_path"]
+            with open(output_path, "w", encoding="utf-8") as f:
+                f.write(review + "\n")
+            self.logger.info(f"Batch review written to {output_path}")
+            results[index] = {**result, "output_path": output_path}
+        return failed
+
+    def _pack_submission(self, submission_id: str, target_homework_dir: str) -> str:
+        parts = [f"=== SUBMISSION {submission_id} ==="]
+        for relative, _ in self._list_files(target_homework_dir):
+            with open(os.path.join(target_homework_dir, relative), encoding="utf-8", errors="replace") as f:
+                content = f.read()
+            parts.append(f"--- FILE: {relative.replace(os.sep, '/')} ---\n{content}\n--- END FILE ---")
+        parts.append(f"=== END SUBMISSION {submission_id} ===")
+        return "\n".join(parts)
+
+    def _split_batch_output(self, output: str) -> Dict[str, str]:
+        return {
+            match.group(1): match.group(2).strip()
+            for match in re.finditer(r"<<<REVIEW (S\d+)>>>(.*?)<<<END REVIEW \1>>>", output, re.DOTALL)
+        }
+
+    def _is_valid_review(self, review: str) -> bool:
+        return all(section in review for section in REQUIRED_REVIEW_SECTIONS)
+
+    def _list_files(self, target_homework_dir: str) -> List[tuple]:
+        """List (relative path, estimated tokens) for every reviewable file, in a stable order."""
+        files = []
+        for root, dirs, names in os.walk(target_homework_dir):
+            dirs[:] = sorted(d for d in dirs if d not in IGNORED_DIRS)
+            for name in sorted(names):
+                path = os.path.join(root, name)
+                if not GENERATED_FILE_PATTERN.fullmatch(name) and self._is_reviewable(path):
+                    files.append((os.path.relpath(path, target_homework_dir), self._estimate_tokens(path)))
+        return files
+
+    def _split_feedback(self, feedback: List[str]) -> Dict[str, str]:
+        """Map each file path to its per-file section (a `### ` heading) from the map replies."""
+        sections = {}
+        for reply in feedback:
+            matches = list(re.finditer(r"^### `([^`]+)`[ \t]*$", reply, re.MULTILINE))
+            if not matches:
+                self.logger.warning("A review group reply has no per-file sections, ignoring it")
+            for match, following in zip(matches, matches[1:] + [None]):
+                end = following.start() if following else len(reply)
+                sections[match.group(1)] = reply[match.start():end].strip()
+        return sections
+
+    def _assemble_report(self, reduce_output: str, feedback: List[str]) -> str:
+        """Replace each <<<FILES>>> list in the reduce reply with the per-file feedback it names."""
+        sections = self._split_feedback(feedback)
+        blocks = list(re.finditer(r"<<<FILES>>>(.*?)<<<END FILES>>>", reduce_output, re.DOTALL))
+        if not blocks:
+            raise RuntimeError("Reduce review did not list the files for Detailed Feedback")
+
+        claimed = [
+            [path for path in (line.strip().strip("`") for line in block.group(1).splitlines()) if path in sections]
+            for block in blocks
+        ]
+        listed = {path for paths in claimed for path in paths}
+        # Feedback the reduce call did not place still belongs in the report
+        claimed[-1].extend(path for path in sections if path not in listed)
+
+        parts = []
+        position = 0
+        for block, paths in zip(blocks, claimed):
+            parts.append(reduce_output[position:block.start()])
+            parts.append("\n\n".join(sections.pop(path) for path in paths if path in sections))
+            position = block.end()
+        parts.append(reduce_output[position:])
+        report = "".join(parts).strip()
+        if not self._is_valid_review(report):
+            raise RuntimeError("Reduce review is missing a required section")
+        return report
+
+    def _feedback_path(self, output_path: str) -> str:
+        # Hidden and without the homework-review- prefix so it is never mistaken for a report
+        stem = os.path.splitext(os.path.basename(output_path))[0]
+        if stem.startswith("homework-review-"):
+            stem = stem[len("homework-review-"):]
+        return os.path.join(os.path.dirname(output_path), f".review-feedback-{stem}.md")
+
+    def _review_group(
+        self,
+        target_homework_dir: str,
+        homework_requirement_path: str,
+        group_index: int,
+        group_count: int,
+        files: List[str]
+    ) -> str:
+        file_list = "\n".join(f"- @{os.path.join(target_homework_dir, f)}" for f in files)
+        map_prompt = REVIEW_MAP_PROMPT_EN.format(
+            group_index=group_index,
+            group_count=group_count,
+            target_homework_dir=target_homework_dir,
+            homework_requirement_path=homework_requirement_path,
+            file_list=file_list
+        )
+        self.logger.info(f"Reviewing group {group_index}/{group_count} ({len(files)} files)")
+        result = self._call_llm(map_prompt, allowed_tools="Read")
+        return json.loads(result["stdout"])["result"].strip()
+
+    def _is_reviewable(self, path: str) -> bool:
+        if os.path.splitext(path)[1].lower() in BINARY_EXTENSIONS:
+            return False
+        try:
+            with open(path, "rb") as f:
+                return b"\0" not in f.read(1024)
+        except OSError:
+            return False
+
+    def _estimate_tokens(self, path: str) -> int:
+        return max(1, os.path.getsize(path) // CHARS_PER_TOKEN)
+
     def _generate_review_prompt(
         self, 
         target_homework_dir: str, 
@@ -46,15 +397,29 @@ class Reviewer:
             homework_requirement_path=homework_requirement_path
         )
 
-    def _call_llm(self, prompt: str) -> Dict[str, Any]:
+    def _call_llm(
+        self,
+        prompt: str,
+        allowed_tools: str = "Bash,Read,Write",
+        artifacts: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        if self.cassette:
+            return self.cassette.call(
+                f"claude:{allowed_tools}", prompt, lambda: self._run_llm(prompt, allowed_tools), artifacts
+            )
+        return self._run_llm(prompt, allowed_tools)
+
+    def _run_llm(self, prompt: str, allowed_tools: str) -> Dict[str, Any]:
         self.logger.info("Calling LLM for review...")
         
-        result = subprocess.run(
-            f"claude -p \"{prompt}\" --output-format json --allowed-tools Bash,Read,Write",
-            shell=True,
-            capture_output=True,
-            text=True,
-        )
+        # The prompt goes over stdin so quotes, $ and length never hit the shell or ARG_MAX
+        with self._llm_slots:
+            result = subprocess.run(
+                ['claude', '-p', '--output-format', 'json', '--allowed-tools', allowed_tools],
+                input=prompt,
+                capture_output=True,
+                text=True,
+            )
         
         if result.returncode != 0:
             self.logger.error(f"LLM call failed with exit code {result.returncode}")
@@ -0,0 +1,207 @@
+import math
+import shlex
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+import logging
+
+from .cloner import GitCloner
+
+
+DEFAULT_HOST_LIMITS = {"github.com": 2, "gitee.com": 2}
+
+
+@dataclass
+class ReviewJob:
+    link: str
+    requirement_path: str
+    priority: int = 0
+    deadline: Optional[datetime] = None
+    flagged: bool = False
+    index: int = 0
+    repo_info: Optional[Dict[str, str]] = None
+    estimated_cost: float = math.inf
+    error: Optional[str] = None
+    result: Any = field(default=None, repr=False)
+    # Jobs reviewed together when this is a packed job built by BatchScheduler.pack
+    members: List["ReviewJob"] = field(default_factory=list, repr=False)
+
+    @property
+    def host(self) -> str:
+        url = self.repo_info["repo"] if self.repo_info else self.link
+        return (urlsplit(url).hostname or "").lower()
+
+
+def load_batch_file(path: str, default_requirement_path: str) -> List[ReviewJob]:
+    """
+    Parse a batch file with one submission per line: `<link> [req=PATH] [priority=N] [deadline=ISO] [flag]`.
+
+    Blank lines and lines starting with # are ignored.
+    """
+    jobs = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            tokens = shlex.split(line)
+            job = ReviewJob(link=tokens[0], requirement_path=default_requirement_path, index=len(jobs))
+            for token in tokens[1:]:
+                key, _, value = token.partition("=")
+                try:
+                    if key == "req":
+                        job.requirement_path = value
+                    elif key == "priority":
+                        job.priority = int(value)
+                    elif key == "deadline":
+                        deadline = datetime.fromisoformat(value)
+                        if deadline.tzinfo is not None:
+                            deadline = deadline.astimezone().replace(tzinfo=None)
+                        job.deadline = deadline
+                    elif key == "flag":
+                        job.flagged = True
+                    else:
+                        raise ValueError(f"unknown option '{key}'")
+                except ValueError as e:
+                    raise ValueError(f"Invalid batch file line {line_number}: {e}") from e
+            jobs.append(job)
+    return jobs
+
+
+class HostLimiter:
+    """Caps how many jobs talk to the same git host at once."""
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        self._semaphores = {
+            host: threading.BoundedSemaphore(limit)
+            for host, limit in (DEFAULT_HOST_LIMITS if limits is None else limits).items()
+        }
+
+    def slot(self, host: str):
+        semaphore = self._semaphores.get(host)
+        return semaphore if semaphore is not None else _NoLimit()
+
+
+class _NoLimit:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class BatchScheduler:
+    """Orders review jobs shortest-first, with deadline and TA-flag overrides, and runs them with per-host caps."""
+
+    def __init__(
+        self,
+        logger: Optional[logging.Logger] = None,
+        cloner: Optional[GitCloner] = None,
+        max_workers: int = 4,
+        host_limits: Optional[Dict[str, int]] = None,
+        deadline_window: timedelta = timedelta(hours=24),
+    ):
+        self.logger = logger or logging.getLogger(__name__)
+        self.cloner = cloner or GitCloner(self.logger)
+        self.max_workers = max_workers
+        self.host_limiter = HostLimiter(host_limits)
+        self.deadline_window = deadline_window
+
+    def estimate_costs(self, jobs: List[ReviewJob]) -> None:
+        """Pre-size each job by counting the files in its homework directory; unknown sizes sort last."""
+        def probe(job: ReviewJob) -> None:
+            if not job.repo_info:
+                return
+            repo_url = job.repo_info["repo"]
+            branch = job.repo_info["branch"]
+            try:
+                with self.host_limiter.slot(job.host):
+                    if not self.cloner.remote_branch_exists(repo_url, branch):
+                        self.logger.warning(f"Branch {branch} not found in {repo_url}")
+                        return
+                    job.estimated_cost = self.cloner.probe_tree_size(
+                        repo_url, branch, job.repo_info["user_homework_dir"]
+                    )
+            except RuntimeError as e:
+                self.logger.warning(f"Could not estimate size of {job.link}: {e}")
+                return
+            self.logger.info(f"Estimated {job.link}: {job.estimated_cost} files")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(probe, jobs))
+
+    def is_urgent(self, job: ReviewJob, now: datetime) -> bool:
+        return job.flagged or (job.deadline is not None and job.deadline - now <= self.deadline_window)
+
+    def order(self, jobs: List[ReviewJob], now: Optional[datetime] = None) -> List[ReviewJob]:
+        now = now or datetime.now()
+
+        def sort_key(job: ReviewJob):
+            # Urgent jobs go earliest-deadline-first; everything else is shortest-job-first
+            if self.is_urgent(job, now):
+                return (0, job.deadline or datetime.max, -job.priority, job.estimated_cost, job.index)
+            return (1, datetime.max, -job.priority, job.estimated_cost, job.index)
+
+        return sorted(jobs, key=sort_key)
+
+    def pack(self, ordered: List[ReviewJob], max_cost: float, now: Optional[datetime] = None) -> List[ReviewJob]:
+        """
+        Fold small, non-urgent jobs that share a requirements file into one packed job per file.
+
+        A packed job takes the place of its first member in the given order, so after shortest-first
+        ordering the packed reviews start ahead of the larger submissions. Its jobs are in `members`.
+        """
+        now = now or datetime.now()
+        groups: Dict[str, List[ReviewJob]] = {}
+        for job in ordered:
+            if job.estimated_cost <= max_cost and not self.is_urgent(job, now):
+                groups.setdefault(job.requirement_path, []).append(job)
+
+        packed_at: Dict[int, ReviewJob] = {}
+        for requirement_path, members in groups.items():
+            if len(members) < 2:
+                continue
+            packed = ReviewJob(
+                link=f"{len(members)} packed submissions for {requirement_path}",
+                requirement_path=requirement_path,
+                index=members[0].index,
+                estimated_cost=sum(job.estimated_cost for job in members),
+                members=members,
+            )
+            for job in members:
+                packed_at[id(job)] = packed
+
+        result = []
+        for job in ordered:
+            packed = packed_at.get(id(job))
+            if packed is None:
+                result.append(job)
+            elif packed.members[0] is job:
+                result.append(packed)
+        return result
+
+    def run(self, jobs: List[ReviewJob], func: Callable[[ReviewJob, Any], Any]) -> List[ReviewJob]:
+        """
+        Run func(job, host_slot) for each job in the given order.
+
+        host_slot is a context manager the job should hold while it talks to the git host; a packed
+        job should take each member's slot from host_limiter instead. Failures are recorded on the job
+        instead of stopping the batch, and on any member of a failed packed job left without an outcome.
+        """
+        def run_job(job: ReviewJob) -> ReviewJob:
+            try:
+                job.result = func(job, self.host_limiter.slot(job.host))
+            except Exception as e:
+                self.logger.error(f"Review of {job.link} failed: {e}")
+                job.error = str(e)
+                for member in job.members:
+                    if member.result is None and member.error is None:
+                        member.error = job.error
+            return job
+
+        # The executor dequeues in submission order, so jobs start in scheduled order
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(run_job, jobs))
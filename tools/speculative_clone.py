@@ -0,0 +1,146 @@
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
+import logging
+
+
+SPECULATIVE_HOSTS = ("github.com", "gitee.com", "gitlab.com")
+
+
+def guess_repo_url(link: str) -> Optional[str]:
+    """Guess the clone URL from the first two path segments of a repository link."""
+    if not link:
+        return None
+    parts = urlsplit(link.strip())
+    host = (parts.hostname or "").lower()
+    if parts.scheme not in ("http", "https") or host not in SPECULATIVE_HOSTS:
+        return None
+    segments = [s for s in parts.path.split("/") if s]
+    if len(segments) < 2:
+        return None
+    owner, repo = segments[0], segments[1]
+    if repo.endswith(".git"):
+        repo = repo[:-4]
+    return f"https://{host}/{owner}/{repo}.git"
+
+
+def normalize_repo_url(repo_url: str) -> str:
+    normalized = repo_url.strip().rstrip("/").lower()
+    if normalized.endswith(".git"):
+        normalized = normalized[:-4]
+    return normalized.replace("http://", "https://", 1)
+
+
+class SpeculativeClone:
+    """
+    Clones a guessed repository in the background while the real repo info is still being extracted.
+
+    The clone is partial (--filter=blob:none) and skips checkout so that every branch is available
+    and only the blobs of the confirmed branch are fetched once it is known.
+    """
+
+    def __init__(self, repo_url: str, target_dir: str, logger: Optional[logging.Logger] = None):
+        if not repo_url:
+            raise ValueError("Repository URL cannot be empty")
+
+        if not target_dir:
+            raise ValueError("Target directory cannot be empty")
+
+        self.repo_url = repo_url
+        self.target_path = Path(target_dir)
+        self.logger = logger or logging.getLogger(__name__)
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._process: Optional[subprocess.Popen] = None
+        self._waiter: Optional[threading.Thread] = None
+        self._stderr = ""
+        self._confirmed = False
+
+    def start(self) -> None:
+        if self.target_path.exists():
+            shutil.rmtree(self.target_path)
+        self.target_path.parent.mkdir(parents=True, exist_ok=True)
+
+        cmd = ['git', 'clone', '--no-checkout', '--filter=blob:none', self.repo_url, str(self.target_path)]
+        self.logger.info(f"Speculatively cloning {self.repo_url} to {self.target_path}")
+        self.started_at = time.monotonic()
+        self._process = subprocess.Popen(
+            cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+        self._waiter = threading.Thread(target=self._wait, daemon=True)
+        self._waiter.start()
+
+    def matches(self, repo_url: str) -> bool:
+        return normalize_repo_url(repo_url) == normalize_repo_url(self.repo_url)
+
+    def confirm(self, repo_url: str, branch: str, target_dir: str) -> Optional[str]:
+        """
+        Finish the speculative clone for the confirmed repo and branch and move it to target_dir.
+
+        Returns the checkout path, or None if the guess was wrong or the clone failed; in that
+        case the speculative clone is cancelled and cleaned up.
+        """
+        if self._process is None:
+            raise RuntimeError("Speculative clone was not started")
+
+        if not self.matches(repo_url):
+            self.logger.info(f"Speculative clone missed: guessed {self.repo_url}, extracted {repo_url}")
+            self.cancel()
+            return None
+
+        self._waiter.join()
+        if self._process.returncode != 0:
+            self.logger.warning(f"Speculative clone failed: {self._stderr.strip()}")
+            self.cancel()
+            return None
+
+        try:
+            subprocess.run(
+                ['git', '-C', str(self.target_path), 'checkout', branch],
+                capture_output=True, text=True, check=True
+            )
+        except subprocess.CalledProcessError as e:
+            stderr = e.stderr if e.stderr else "Unknown error"
+            self.logger.warning(f"Speculative checkout of {branch} failed: {stderr.strip()}")
+            self.cancel()
+            return None
+
+        target_path = Path(target_dir)
+        if target_path.exists():
+            self.logger.warning(f"Target directory {target_dir} already exists. Removing it.")
+            shutil.rmtree(target_path)
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(self.target_path), str(target_path))
+        self._confirmed = True
+
+        self.logger.info(f"Speculative clone hit, checked out {branch} at {target_dir}")
+        return str(target_path.absolute())
+
+    def cancel(self) -> None:
+        if self._confirmed or self._process is None:
+            return
+        if self._process.poll() is None:
+            self.logger.info(f"Cancelling speculative clone of {self.repo_url}")
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+        self._waiter.join()
+        shutil.rmtree(self.target_path, ignore_errors=True)
+
+    def latency_saved(self, extract_finished_at: float) -> float:
+        """Seconds of clone work that overlapped with extraction."""
+        if self.started_at is None:
+            return 0.0
+        overlap_end = min(self.finished_at or extract_finished_at, extract_finished_at)
+        return max(0.0, overlap_end - self.started_at)
+
+    def _wait(self) -> None:
+        _, stderr = self._process.communicate()
+        self._stderr = stderr or ""
+        self.finished_at = time.monotonic()